@@ -1,8 +1,9 @@
 import logging
 import json
 from pathlib import Path
-from models import PersonProfile
-from matchmaking import generate_pairing_summary
+from event_data import InvalidEventId, event_profiles_path
+from matchmaking import rank_best_matches_per_objective
+from shards import acquire_shard
 
 logger = logging.getLogger(__name__)
 
@@ -10,25 +11,33 @@ BASE_DIR = Path(__file__).parent
 DATA_DIR = BASE_DIR / "data"
 
 def run_networking_event(event_id: str):
-    profiles_file = DATA_DIR / f"{event_id}_profiles.json"
+    try:
+        profiles_file = Path(event_profiles_path(event_id))
+    except InvalidEventId as e:
+        logger.error(str(e))
+        return
     if not profiles_file.exists():
         logger.error(f"Missing profiles file: {profiles_file}")
         return
     try:
-        raw = json.loads(profiles_file.read_text())
+        # Same shard /chat uses for this event: already-embedded
+        # profiles are restored from its matrix file, not re-embedded
+        shard = acquire_shard(event_id)
     except json.JSONDecodeError as e:
         logger.error(f"Invalid JSON in {profiles_file}: {e}")
         return
-    profiles = []
-    for item in raw:
-        try:
-            profiles.append(PersonProfile(**item))
-        except Exception as e:
-            logger.error(f"Invalid profile {item}: {e}")
-    if not profiles:
-        logger.warning(f"No profiles for event '{event_id}'")
-        return
-    matchups = generate_pairing_summary(profiles)
+    try:
+        if not shard.profiles:
+            logger.warning(f"No profiles for event '{event_id}'")
+            return
+        matchups = {
+            person.id: rank_best_matches_per_objective(
+                person, shard.candidates_for(person.id), index=shard.index
+            )
+            for person in shard.profiles
+        }
+    finally:
+        shard.release()
     output_file = DATA_DIR / f"{event_id}_matchups.json"
     output_file.write_text(json.dumps(matchups, indent=2))
     logger.info(f"Matchups written to {output_file}")
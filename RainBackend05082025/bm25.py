@@ -0,0 +1,220 @@
+import heapq
+import math
+import re
+import threading
+from collections import Counter
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+# =========================================================
+# Configuration (TUNABLE)
+# =========================================================
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Dropped from queries and documents: they match nearly everyone
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from",
+    "i", "in", "into", "is", "it", "me", "my", "of", "on", "or", "our",
+    "that", "the", "this", "to", "we", "with", "who", "want", "looking",
+    "find", "someone", "help", "need",
+}
+
+# Letters and digits stay together, so "ISO27001" and "PnL" are single
+# exact terms rather than being split or stemmed away
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    return [
+        t for t in _TOKEN.findall((text or "").lower())
+        if t not in STOPWORDS
+    ]
+
+# =========================================================
+# Index
+# =========================================================
+
+class BM25Index:
+    """
+    In-memory inverted index scored with Okapi BM25.
+
+    term -> {doc id: term frequency}. Adding, replacing or removing a
+    document only touches that document's own terms, and IDF / average
+    length are derived from running totals at query time, so there is
+    no rebuild step. A query walks the postings of its own terms only.
+    """
+
+    def __init__(self, k1: float = BM25_K1, b: float = BM25_B):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[str, int]] = {}
+        self.lengths: Dict[str, int] = {}
+        self.texts: Dict[str, str] = {}
+        self.total_length = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.lengths)
+
+    def upsert(self, doc_id: str, text: str) -> bool:
+        """
+        Index `text` under `doc_id`, replacing any previous version.
+        Returns False (and does nothing) if the text is unchanged.
+        """
+        if self.texts.get(doc_id) == text:
+            return False
+
+        counts = Counter(tokenize(text))
+        with self._lock:
+            self._remove_locked(doc_id)
+            for term, tf in counts.items():
+                self.postings.setdefault(term, {})[doc_id] = tf
+            length = sum(counts.values())
+            self.lengths[doc_id] = length
+            self.texts[doc_id] = text
+            self.total_length += length
+        return True
+
+    def remove(self, doc_id: str) -> None:
+        with self._lock:
+            self._remove_locked(doc_id)
+
+    def _remove_locked(self, doc_id: str) -> None:
+        text = self.texts.pop(doc_id, None)
+        if text is None:
+            return
+        for term in set(tokenize(text)):
+            posting = self.postings.get(term)
+            if posting is not None:
+                posting.pop(doc_id, None)
+                if not posting:
+                    del self.postings[term]
+        self.total_length -= self.lengths.pop(doc_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.postings.clear()
+            self.lengths.clear()
+            self.texts.clear()
+            self.total_length = 0
+
+    def search(self, query: str, n_results: int) -> List[Tuple[str, float]]:
+        """
+        Top documents for `query`: [(doc id, score)], best first.
+        Documents sharing no term with the query are never returned.
+        """
+
+        terms = set(tokenize(query))
+        if not terms or n_results <= 0:
+            return []
+
+        scores: Dict[str, float] = {}
+        with self._lock:
+            n_docs = len(self.lengths)
+            if not n_docs:
+                return []
+            avg_length = self.total_length / n_docs
+
+            for term in terms:
+                posting = self.postings.get(term)
+                if not posting:
+                    continue
+                df = len(posting)
+                idf = math.log(1.0 + (n_docs - df + 0.5) / (df + 0.5))
+                for doc_id, tf in posting.items():
+                    norm = self.k1 * (
+                        1.0 - self.b
+                        + self.b * self.lengths[doc_id] / avg_length
+                    )
+                    scores[doc_id] = scores.get(doc_id, 0.0) + (
+                        idf * tf * (self.k1 + 1.0) / (tf + norm)
+                    )
+
+        return heapq.nlargest(n_results, scores.items(), key=lambda x: x[1])
+
+    def freeze(self, doc_ids: List[str]) -> Dict[str, np.ndarray]:
+        """
+        The postings as flat arrays (see FrozenBM25), documents
+        numbered by their position in `doc_ids`.
+        """
+
+        rows = {doc_id: row for row, doc_id in enumerate(doc_ids)}
+        with self._lock:
+            terms = sorted(self.postings)
+            offsets = [0]
+            posting_rows: List[int] = []
+            posting_tfs: List[int] = []
+            for term in terms:
+                for doc_id, tf in self.postings[term].items():
+                    if doc_id in rows:
+                        posting_rows.append(rows[doc_id])
+                        posting_tfs.append(tf)
+                offsets.append(len(posting_rows))
+            lengths = [self.lengths.get(doc_id, 0) for doc_id in doc_ids]
+
+        return {
+            "bm25_terms": np.asarray(terms, dtype=str),
+            "bm25_offsets": np.asarray(offsets, dtype=np.int64),
+            "bm25_rows": np.asarray(posting_rows, dtype=np.int32),
+            "bm25_tfs": np.asarray(posting_tfs, dtype=np.int32),
+            "bm25_lengths": np.asarray(lengths, dtype=np.int32),
+        }
+
+
+class FrozenBM25:
+    """
+    Read-only BM25Index over arrays from BM25Index.freeze(), which may
+    be memory-mapped: sorted terms, per-term slices of (row, tf) in
+    CSR layout, and document lengths. Opening one costs nothing; a
+    query binary-searches its terms and reads their postings only.
+    """
+
+    def __init__(
+        self,
+        doc_ids: List[str],
+        arrays: Dict[str, np.ndarray],
+        k1: float = BM25_K1,
+        b: float = BM25_B,
+    ):
+        self.k1 = k1
+        self.b = b
+        self.doc_ids = doc_ids
+        self.terms = arrays["bm25_terms"]
+        self.offsets = arrays["bm25_offsets"]
+        self.rows = arrays["bm25_rows"]
+        self.tfs = arrays["bm25_tfs"]
+        self.lengths = arrays["bm25_lengths"]
+        self.total_length = int(self.lengths.sum())
+
+    def __len__(self) -> int:
+        return len(self.doc_ids)
+
+    def search(self, query: str, n_results: int) -> List[Tuple[str, float]]:
+        terms = set(tokenize(query))
+        n_docs = len(self.doc_ids)
+        if not terms or n_results <= 0 or not n_docs or not len(self.terms):
+            return []
+        avg_length = self.total_length / n_docs
+
+        scores: Dict[int, float] = {}
+        for term in terms:
+            i = int(np.searchsorted(self.terms, term))
+            if i >= len(self.terms) or self.terms[i] != term:
+                continue
+            start, end = int(self.offsets[i]), int(self.offsets[i + 1])
+            rows = np.asarray(self.rows[start:end])
+            tfs = np.asarray(self.tfs[start:end], dtype=np.float64)
+            df = end - start
+            idf = math.log(1.0 + (n_docs - df + 0.5) / (df + 0.5))
+            norm = self.k1 * (
+                1.0 - self.b + self.b * self.lengths[rows] / avg_length
+            )
+            contrib = idf * tfs * (self.k1 + 1.0) / (tfs + norm)
+            for row, value in zip(rows.tolist(), contrib.tolist()):
+                scores[row] = scores.get(row, 0.0) + value
+
+        top = heapq.nlargest(n_results, scores.items(), key=lambda x: x[1])
+        return [(self.doc_ids[row], score) for row, score in top]
@@ -0,0 +1,389 @@
+import argparse
+import csv
+import hashlib
+import json
+import logging
+import os
+import re
+import sys
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import profile_store
+
+# =========================================================
+# Logging
+# =========================================================
+
+logger = logging.getLogger(__name__)
+
+# =========================================================
+# Configuration (TUNABLE)
+# =========================================================
+
+IMPORT_BATCH_SIZE = 500       # rows per store transaction / index enqueue
+MAX_LOGGED_ERRORS = 20        # per import; the rest are only counted
+
+# Header aliases, compared after lower-casing and dropping spaces,
+# underscores and dashes ("User Name" == "userName" == "user_name")
+COLUMN_ALIASES = {
+    "id": {"userid", "id", "personid"},
+    "name": {"username", "name", "fullname"},
+    "profile": {"userprofileinfo", "profile", "profileinfo", "profilejson"},
+    "objectives": {"userobjective", "objective", "objectives",
+                   "userobjectives"},
+}
+
+# The objective cell is stored verbatim as one objective, like
+# inputdata.xlsx rows; with split_objectives it is split on these
+# instead (one objective per ";" or line)
+OBJECTIVE_SEPARATORS = re.compile(r"[;\n]+")
+
+# =========================================================
+# Streaming readers (one row dict at a time)
+# =========================================================
+
+def _normalize_header(header: Any) -> str:
+    return re.sub(r"[\s_\-]+", "", str(header or "")).lower()
+
+
+def _columns(headers: List[Any]) -> Dict[str, int]:
+    """
+    Field -> column position for the columns this importer understands.
+    """
+    positions = {}
+    for pos, header in enumerate(headers):
+        key = _normalize_header(header)
+        for field, aliases in COLUMN_ALIASES.items():
+            if key in aliases and field not in positions:
+                positions[field] = pos
+    return positions
+
+
+def iter_xlsx_rows(
+    path: str, sheet: Optional[str] = None
+) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """
+    (row number, {field: cell}) from an .xlsx sheet. Uses openpyxl's
+    read-only mode, which streams the sheet XML instead of loading the
+    workbook.
+    """
+
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        ws = workbook[sheet] if sheet else workbook.worksheets[0]
+        rows = ws.iter_rows(values_only=True)
+        columns = _columns(list(next(rows, [])))
+        for number, row in enumerate(rows, start=2):
+            yield number, {
+                field: row[pos] if pos < len(row) else None
+                for field, pos in columns.items()
+            }
+    finally:
+        workbook.close()
+
+
+def iter_csv_rows(path: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """
+    (row number, {field: cell}) from a CSV file, read line by line.
+    """
+
+    # Profile JSON cells can exceed the default 128 KiB field limit
+    csv.field_size_limit(min(sys.maxsize, 2 ** 31 - 1))
+
+    with open(path, "r", newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        columns = _columns(next(reader, []))
+        for number, row in enumerate(reader, start=2):
+            yield number, {
+                field: row[pos] if pos < len(row) else None
+                for field, pos in columns.items()
+            }
+
+
+def iter_rows(path: str, sheet: Optional[str] = None):
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".xlsx", ".xlsm"):
+        return iter_xlsx_rows(path, sheet)
+    if ext == ".csv":
+        return iter_csv_rows(path)
+    raise ValueError(
+        f"Unsupported file type '{ext}' (expected .xlsx or .csv)"
+    )
+
+# =========================================================
+# Row mapping / validation
+# =========================================================
+
+class RowError(ValueError):
+    pass
+
+
+def _text(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)   # Excel stores numeric ids as floats
+    return str(value).strip()
+
+
+def generated_id(name: str) -> str:
+    """
+    Stable id for rows that only carry a name, so re-importing the
+    same sheet updates rather than duplicates.
+    """
+    digest = hashlib.sha1(name.strip().lower().encode("utf-8")).hexdigest()
+    return f"imp-{digest[:16]}"
+
+
+def map_row(
+    row: Dict[str, Any],
+    split_objectives: bool = False,
+) -> Tuple[Optional[str], str, Optional[dict], Optional[List[str]]]:
+    """
+    One sheet row -> (id or None, name, raw profile or None,
+    objectives or None). None means "column absent or empty": the
+    stored value is left alone.
+    """
+
+    person_id = _text(row.get("id")) or None
+    name = _text(row.get("name"))
+
+    profile = None
+    info = _text(row.get("profile"))
+    if info:
+        try:
+            profile = json.loads(info)
+        except json.JSONDecodeError as e:
+            raise RowError(f"profile info is not valid JSON ({e.msg})")
+        if not isinstance(profile, dict):
+            raise RowError("profile info must be a JSON object")
+        name = name or _text(profile.get("name"))
+        person_id = person_id or _text(profile.get("id")) or None
+
+    if not name and not person_id:
+        raise RowError("row has neither a name nor an id")
+
+    objectives = None
+    cell = _text(row.get("objectives"))
+    if cell and split_objectives:
+        objectives = [
+            o.strip() for o in OBJECTIVE_SEPARATORS.split(cell) if o.strip()
+        ]
+    elif cell:
+        objectives = [cell]
+
+    if profile is None and objectives is None:
+        raise RowError("row has no profile info and no objectives")
+
+    return person_id, name, profile, objectives
+
+
+def _validate(raw: dict, objectives: Optional[List[str]]) -> None:
+    """
+    Same mapping the server uses, so anything stored here can be
+    loaded and indexed.
+    """
+    if "top_skills" in raw and not isinstance(raw["top_skills"], list):
+        raise RowError("top_skills must be a list")
+    if "solutions_offered" in raw and not isinstance(
+        raw["solutions_offered"], list
+    ):
+        raise RowError("solutions_offered must be a list")
+    try:
+        profile_store.to_person_profile(raw, objectives or [])
+    except Exception as e:
+        raise RowError(f"profile does not map to PersonProfile ({e})")
+
+# =========================================================
+# Import
+# =========================================================
+
+class ImportReport:
+    def __init__(self, source: str):
+        self.source = source
+        self.rows = 0
+        self.created = 0
+        self.updated = 0
+        self.objectives = 0
+        self.duplicates = 0
+        self.invalid = 0
+        self.batches = 0
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+
+    def rows_per_second(self) -> float:
+        elapsed = self.elapsed or (time.perf_counter() - self.started)
+        return self.rows / elapsed if elapsed else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "source": self.source,
+            "rows": self.rows,
+            "created": self.created,
+            "updated": self.updated,
+            "objective_sets": self.objectives,
+            "duplicates_merged": self.duplicates,
+            "invalid": self.invalid,
+            "batches": self.batches,
+            "seconds": round(self.elapsed, 2),
+            "rows_per_second": round(self.rows_per_second(), 1),
+        }
+
+
+def _write_batch(
+    batch: Dict[str, Tuple[str, Optional[dict], Optional[List[str]]]],
+    report: ImportReport,
+    on_batch: Optional[Callable[[List[str]], None]],
+) -> None:
+    """
+    batch: id -> (name, raw profile or None, objectives or None),
+    already de-duplicated. One transaction per table.
+    """
+
+    ids = list(batch)
+    existing = profile_store.existing_ids(ids)
+
+    profiles, objective_sets = [], []
+    for pid, (name, raw, objectives) in batch.items():
+        if raw is not None:
+            profiles.append(raw)
+        elif pid not in existing:
+            # Objectives-only row for someone new: minimal profile
+            profiles.append({"id": pid, "name": name})
+        if objectives is not None:
+            objective_sets.append((pid, objectives))
+
+        if pid in existing:
+            report.updated += 1
+        else:
+            report.created += 1
+
+    if profiles:
+        profile_store.upsert_profiles(profiles)
+    if objective_sets:
+        report.objectives += profile_store.set_objectives_many(objective_sets)
+
+    report.batches += 1
+    if on_batch is not None:
+        on_batch(ids)
+
+    logger.info(
+        f"📥 {report.source}: {report.rows} rows "
+        f"({report.rows_per_second():.0f} rows/s)"
+    )
+
+
+def import_rows(
+    rows: Iterator[Tuple[int, Dict[str, Any]]],
+    source: str,
+    batch_size: int = IMPORT_BATCH_SIZE,
+    on_batch: Optional[Callable[[List[str]], None]] = None,
+    split_objectives: bool = False,
+) -> ImportReport:
+    """
+    Validate, de-duplicate and write rows in batches of `batch_size`.
+    Only one batch is held in memory. Rows are matched to existing
+    people by id, else by exact name (store lookup, so duplicates
+    across batches merge too); within the file the last row wins.
+    `on_batch` receives each batch's ids (e.g. to enqueue re-indexing).
+    An objective cell is one objective unless `split_objectives`.
+    """
+
+    report = ImportReport(source)
+    batch: Dict[str, Tuple[str, Optional[dict], Optional[List[str]]]] = {}
+    names: Dict[str, str] = {}   # name -> id, current batch only
+
+    for number, row in rows:
+        report.rows += 1
+        try:
+            person_id, name, raw, objectives = map_row(
+                row, split_objectives
+            )
+            if person_id is None:
+                person_id = (
+                    names.get(name)
+                    or profile_store.find_profile_id_by_name(name)
+                    or generated_id(name)
+                )
+            if raw is not None:
+                raw = dict(raw, id=person_id, name=name or raw.get("name"))
+                _validate(raw, objectives)
+        except RowError as e:
+            report.invalid += 1
+            if report.invalid <= MAX_LOGGED_ERRORS:
+                logger.warning(f"{source} row {number}: {e}")
+            continue
+
+        if person_id in batch:
+            report.duplicates += 1
+            _, old_raw, old_objectives = batch[person_id]
+            if raw is None:
+                raw = old_raw
+            if objectives is None:
+                objectives = old_objectives
+        batch[person_id] = (name, raw, objectives)
+        if name:
+            names[name] = person_id
+
+        if len(batch) >= batch_size:
+            _write_batch(batch, report, on_batch)
+            batch, names = {}, {}
+
+    if batch:
+        _write_batch(batch, report, on_batch)
+
+    report.elapsed = time.perf_counter() - report.started
+    if report.invalid > MAX_LOGGED_ERRORS:
+        logger.warning(
+            f"{source}: {report.invalid - MAX_LOGGED_ERRORS} more invalid "
+            "rows not shown"
+        )
+    logger.info(f"✅ Import finished: {report.as_dict()}")
+    return report
+
+
+def import_file(
+    path: str,
+    sheet: Optional[str] = None,
+    batch_size: int = IMPORT_BATCH_SIZE,
+    on_batch: Optional[Callable[[List[str]], None]] = None,
+    split_objectives: bool = False,
+) -> ImportReport:
+    return import_rows(
+        iter_rows(path, sheet), os.path.basename(path), batch_size, on_batch,
+        split_objectives,
+    )
+
+# =========================================================
+# CLI
+# =========================================================
+#
+# Writes to the profile store only; running servers index the new rows
+# themselves (shared mode: the builder; local mode: the index workers'
+# store watcher), off their request path.
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(
+        description="Import attendee spreadsheets into the profile store"
+    )
+    parser.add_argument("paths", nargs="+", help=".xlsx or .csv files")
+    parser.add_argument("--sheet", default=None)
+    parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+    parser.add_argument(
+        "--split-objectives", action="store_true",
+        help="split objective cells on ';' and newlines",
+    )
+    args = parser.parse_args()
+
+    for path in args.paths:
+        report = import_file(
+            path, args.sheet, args.batch_size,
+            split_objectives=args.split_objectives,
+        )
+        for key, value in report.as_dict().items():
+            print(f"{key:>18}: {value}")
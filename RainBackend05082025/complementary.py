@@ -0,0 +1,142 @@
+import json
+import logging
+import os
+import threading
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+import embeddings
+
+# =========================================================
+# Logging
+# =========================================================
+
+logger = logging.getLogger(__name__)
+
+# =========================================================
+# Configuration (TUNABLE)
+# =========================================================
+
+COMPLEMENTARY_FILE = os.path.join(
+    os.path.dirname(__file__), "data", "complementary_objectives.json"
+)
+
+# Minimum cosine similarity between an objective clause and a "need"
+# key before the need's offers are used for expansion
+NEED_MATCH_THRESHOLD = 0.6
+
+OBJECTIVE_CACHE_SIZE = 8192
+
+# =========================================================
+# Objective graph (built once)
+# =========================================================
+#
+# needs:  "Find investors"               -> row in need_vectors
+# offers: "Invest in startups", ...      -> rows in offer_vectors
+# edges:  need index -> offer indices
+
+class ObjectiveGraph:
+
+    def __init__(self, mapping: Dict[str, List[str]]):
+        provider = embeddings.get_provider()
+
+        self.needs: List[str] = list(mapping)
+        self.offers: List[str] = sorted(
+            {o for offers in mapping.values() for o in offers}
+        )
+        offer_index = {o: i for i, o in enumerate(self.offers)}
+        self.edges: List[List[int]] = [
+            [offer_index[o] for o in mapping[need]] for need in self.needs
+        ]
+
+        self.need_vectors = provider.embed(self.needs)
+        self.offer_vectors = provider.embed(self.offers)
+
+
+_graph: Optional[ObjectiveGraph] = None
+_graph_lock = threading.Lock()
+
+
+def load_graph() -> Optional[ObjectiveGraph]:
+    global _graph
+
+    with _graph_lock:
+        if _graph is None:
+            if not os.path.exists(COMPLEMENTARY_FILE):
+                logger.warning(f"Missing data file: {COMPLEMENTARY_FILE}")
+                return None
+
+            with open(COMPLEMENTARY_FILE, "r", encoding="utf-8") as f:
+                mapping = json.load(f)
+
+            _graph = ObjectiveGraph(mapping)
+            nearest_need.cache_clear()
+            logger.info(
+                f"🔗 Objective graph: {len(_graph.needs)} needs, "
+                f"{len(_graph.offers)} offers"
+            )
+        return _graph
+
+# =========================================================
+# Expansion
+# =========================================================
+
+def split_objective(objective: str) -> List[str]:
+    """
+    Objectives are often several goals joined with ';'.
+    """
+    return [c.strip() for c in objective.split(";") if c.strip()]
+
+
+@lru_cache(maxsize=OBJECTIVE_CACHE_SIZE)
+def nearest_need(clause: str) -> Optional[int]:
+    """
+    Index of the closest need key, or None below NEED_MATCH_THRESHOLD.
+    Cached by clause text: embedding happens once per distinct clause.
+    """
+
+    graph = load_graph()
+    if graph is None or not graph.needs:
+        return None
+
+    vector = embeddings.get_provider().embed([clause])[0]
+    sims = graph.need_vectors @ vector
+    best = int(np.argmax(sims))
+
+    if sims[best] < NEED_MATCH_THRESHOLD:
+        return None
+    return best
+
+
+def expand(objective: str) -> List[Tuple[str, np.ndarray]]:
+    """
+    Complementary offers for an objective, with their precomputed
+    embeddings. Empty when no clause maps to a known need.
+    """
+
+    graph = load_graph()
+    if graph is None:
+        return []
+
+    offer_ids: List[int] = []
+    for clause in split_objective(objective):
+        need = nearest_need(clause)
+        if need is None:
+            continue
+        for o in graph.edges[need]:
+            if o not in offer_ids:
+                offer_ids.append(o)
+
+    return [(graph.offers[o], graph.offer_vectors[o]) for o in offer_ids]
+
+
+def warm(objectives: List[str]) -> None:
+    """
+    Precompute need mappings so request-time expansion is a cache hit.
+    Called by the index workers whenever objectives change.
+    """
+    for objective in objectives:
+        for clause in split_objective(objective):
+            nearest_need(clause)
@@ -0,0 +1,377 @@
+import argparse
+import hashlib
+import logging
+import os
+import re
+import time
+from typing import List, Optional
+
+import numpy as np
+
+# =========================================================
+# Logging
+# =========================================================
+
+logger = logging.getLogger(__name__)
+
+# =========================================================
+# Configuration (TUNABLE, overridable per deployment via env)
+# =========================================================
+
+# Provider tier
+#   "default" -> Chroma's bundled all-MiniLM-L6-v2 (ONNX, fp32)
+#   "onnx"    -> own ONNX Runtime session; point EMBEDDING_ONNX_MODEL at a
+#                quantized export for higher CPU throughput
+#   "hash"    -> deterministic feature hashing, no model (tests/offline)
+EMBEDDING_PROVIDER = os.getenv("RAIN_EMBEDDING_PROVIDER", "default")
+
+EMBEDDING_BATCH_SIZE = int(os.getenv("RAIN_EMBEDDING_BATCH_SIZE", "32"))
+EMBEDDING_THREADS = int(os.getenv("RAIN_EMBEDDING_THREADS", "0"))  # 0 = ORT default
+
+# Defaults to the MiniLM files Chroma downloads on first use
+ONNX_MODEL_DIR = os.path.join(
+    os.path.expanduser("~"), ".cache", "chroma", "onnx_models",
+    "all-MiniLM-L6-v2", "onnx",
+)
+EMBEDDING_ONNX_MODEL = os.getenv(
+    "RAIN_EMBEDDING_ONNX_MODEL", os.path.join(ONNX_MODEL_DIR, "model.onnx")
+)
+EMBEDDING_ONNX_TOKENIZER = os.getenv(
+    "RAIN_EMBEDDING_ONNX_TOKENIZER",
+    os.path.join(ONNX_MODEL_DIR, "tokenizer.json"),
+)
+ONNX_MAX_TOKENS = 256
+
+# Dimensionality reduction (0 = keep model dimension)
+EMBEDDING_REDUCE_DIM = int(os.getenv("RAIN_EMBEDDING_REDUCE_DIM", "0"))
+REDUCE_SEED = 1234
+
+HASH_DIM = 384
+
+# =========================================================
+# Helpers
+# =========================================================
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+# =========================================================
+# Providers
+# =========================================================
+
+class EmbeddingProvider:
+    """
+    Base provider. Subclasses implement _embed_batch().
+
+    Output is always float32 and L2-normalized, so dot product ==
+    cosine similarity. Instances are also callable with `input`, like
+    a Chroma embedding function.
+    """
+
+    name = "base"
+
+    def __init__(self, batch_size: int = EMBEDDING_BATCH_SIZE):
+        self.batch_size = max(1, batch_size)
+
+    def _embed_batch(self, texts: List[str]) -> np.ndarray:
+        raise NotImplementedError
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        chunks = [
+            self._embed_batch(texts[i:i + self.batch_size])
+            for i in range(0, len(texts), self.batch_size)
+        ]
+        return _normalize(np.vstack(chunks).astype(np.float32))
+
+    def __call__(self, input: List[str]) -> List[List[float]]:
+        return self.embed(list(input)).tolist()
+
+
+class DefaultProvider(EmbeddingProvider):
+    """
+    Chroma's default model, same vectors as the implicit embedding
+    function. Batch size is honoured; thread count is not exposed.
+    """
+
+    name = "default"
+
+    def __init__(self, batch_size: int = EMBEDDING_BATCH_SIZE):
+        super().__init__(batch_size)
+        from chromadb.utils import embedding_functions
+        self._fn = embedding_functions.DefaultEmbeddingFunction()
+
+    def _embed_batch(self, texts: List[str]) -> np.ndarray:
+        return np.asarray(self._fn(texts), dtype=np.float32)
+
+
+class OnnxProvider(EmbeddingProvider):
+    """
+    Sentence-transformer style ONNX model run directly on ONNX Runtime
+    with an explicit thread count. Works with fp32 or int8-quantized
+    exports (see `python embeddings.py quantize`).
+    """
+
+    name = "onnx"
+
+    def __init__(
+        self,
+        model_path: str = EMBEDDING_ONNX_MODEL,
+        tokenizer_path: str = EMBEDDING_ONNX_TOKENIZER,
+        batch_size: int = EMBEDDING_BATCH_SIZE,
+        threads: int = EMBEDDING_THREADS,
+    ):
+        super().__init__(batch_size)
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        self.tokenizer = Tokenizer.from_file(tokenizer_path)
+        self.tokenizer.enable_truncation(max_length=ONNX_MAX_TOKENS)
+        self.tokenizer.enable_padding(pad_id=0, pad_token="[PAD]")
+
+        options = ort.SessionOptions()
+        options.log_severity_level = 3
+        if threads > 0:
+            options.intra_op_num_threads = threads
+            options.inter_op_num_threads = 1
+
+        self.session = ort.InferenceSession(
+            model_path,
+            sess_options=options,
+            providers=["CPUExecutionProvider"],
+        )
+        self._input_names = {i.name for i in self.session.get_inputs()}
+
+    def _embed_batch(self, texts: List[str]) -> np.ndarray:
+        encoded = self.tokenizer.encode_batch(texts)
+        input_ids = np.array([e.ids for e in encoded], dtype=np.int64)
+        attention = np.array(
+            [e.attention_mask for e in encoded], dtype=np.int64
+        )
+
+        feeds = {"input_ids": input_ids, "attention_mask": attention}
+        if "token_type_ids" in self._input_names:
+            feeds["token_type_ids"] = np.zeros_like(input_ids)
+
+        hidden = self.session.run(None, feeds)[0]
+
+        # Mean pooling over real tokens
+        mask = attention[..., None].astype(np.float32)
+        return (hidden * mask).sum(axis=1) / np.maximum(
+            mask.sum(axis=1), 1e-9
+        )
+
+
+class HashProvider(EmbeddingProvider):
+    """
+    Deterministic feature-hashing embedding (unigrams + bigrams).
+    No model, no downloads, stable across processes: for tests and
+    offline runs, not for match quality.
+    """
+
+    name = "hash"
+
+    _token = re.compile(r"\w+")
+
+    def __init__(self, dim: int = HASH_DIM, batch_size: int = EMBEDDING_BATCH_SIZE):
+        super().__init__(batch_size)
+        self.dim = dim
+
+    def _features(self, text: str) -> List[str]:
+        tokens = self._token.findall(text.lower())
+        return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+    def _embed_batch(self, texts: List[str]) -> np.ndarray:
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                digest = hashlib.blake2b(
+                    feature.encode("utf-8"), digest_size=8
+                ).digest()
+                value = int.from_bytes(digest, "little")
+                sign = 1.0 if value & 1 else -1.0
+                out[row, (value >> 1) % self.dim] += sign
+        return out
+
+
+class ReducedProvider(EmbeddingProvider):
+    """
+    Wraps a provider with a fixed random orthonormal projection to
+    `dim` dimensions (Johnson-Lindenstrauss). Needs no fitting, so
+    documents and queries always land in the same space.
+    """
+
+    def __init__(self, base: EmbeddingProvider, dim: int, seed: int = REDUCE_SEED):
+        super().__init__(base.batch_size)
+        source_dim = getattr(base, "dim", None)
+        if source_dim is not None and dim >= source_dim:
+            raise ValueError(
+                f"Reduced dimension {dim} must be below the {base.name} "
+                f"dimension {source_dim}"
+            )
+        self.base = base
+        self.dim = dim
+        self.seed = seed
+        self.name = f"{base.name}+rp{dim}"
+        self._projection: Optional[np.ndarray] = None
+
+    def _embed_batch(self, texts: List[str]) -> np.ndarray:
+        vectors = self.base.embed(texts)
+
+        if self._projection is None:
+            source_dim = vectors.shape[1]
+            if self.dim >= source_dim:
+                # QR would return a square matrix: no reduction at all,
+                # while the name still claims rp{dim}
+                raise ValueError(
+                    f"Reduced dimension {self.dim} must be below the "
+                    f"{self.base.name} dimension {source_dim}"
+                )
+            rng = np.random.default_rng(self.seed)
+            gaussian = rng.standard_normal((source_dim, self.dim))
+            q, _ = np.linalg.qr(gaussian)
+            self._projection = q[:, :self.dim].astype(np.float32)
+
+        return vectors @ self._projection
+
+# =========================================================
+# Factory
+# =========================================================
+
+_PROVIDERS = {
+    "default": DefaultProvider,
+    "onnx": OnnxProvider,
+    "hash": HashProvider,
+}
+
+_provider: Optional[EmbeddingProvider] = None
+
+
+def build_provider(
+    name: str = EMBEDDING_PROVIDER,
+    reduce_dim: int = EMBEDDING_REDUCE_DIM,
+) -> EmbeddingProvider:
+    if name not in _PROVIDERS:
+        raise ValueError(
+            f"Unknown embedding provider '{name}' "
+            f"(expected one of {sorted(_PROVIDERS)})"
+        )
+
+    provider = _PROVIDERS[name]()
+    if reduce_dim > 0:
+        provider = ReducedProvider(provider, reduce_dim)
+
+    logger.info(
+        f"🧠 Embedding provider: {provider.name} "
+        f"(batch={provider.batch_size})"
+    )
+    return provider
+
+
+def get_provider() -> EmbeddingProvider:
+    """
+    Process-wide provider built from the configuration above.
+    """
+    global _provider
+
+    if _provider is None:
+        _provider = build_provider()
+    return _provider
+
+# =========================================================
+# CLI: benchmark / quantize
+# =========================================================
+
+def _benchmark_corpus():
+    import matchmaking
+    import profile_store
+
+    people = profile_store.list_persons()
+
+    documents = [matchmaking.profile_to_document(p) for p in people]
+    queries = [
+        matchmaking.objective_query(o)
+        for p in people for o in p.objectives
+    ]
+    return documents, queries
+
+
+def _top_k(doc_vectors: np.ndarray, query_vectors: np.ndarray, k: int):
+    sims = query_vectors @ doc_vectors.T
+    return np.argsort(-sims, axis=1)[:, :k]
+
+
+def benchmark(name: str, reduce_dim: int, k: int, repeat: int) -> dict:
+    """
+    Docs/sec of the candidate tier and recall@k of its exact nearest
+    neighbours against the default model's, over the profile store.
+    """
+
+    documents, queries = _benchmark_corpus()
+    if not documents or not queries:
+        raise SystemExit("No profiles/objectives to benchmark against")
+
+    candidate = build_provider(name, reduce_dim)
+    candidate.embed(documents[:1])  # warm-up (model load, projection)
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        doc_vectors = candidate.embed(documents)
+    elapsed = time.perf_counter() - start
+    query_vectors = candidate.embed(queries)
+
+    baseline = build_provider("default", 0)
+    base_top = _top_k(
+        baseline.embed(documents), baseline.embed(queries), k
+    )
+    cand_top = _top_k(doc_vectors, query_vectors, k)
+
+    recall = np.mean([
+        len(set(a) & set(b)) / len(a)
+        for a, b in zip(base_top, cand_top)
+    ])
+
+    return {
+        "provider": candidate.name,
+        "dimension": int(doc_vectors.shape[1]),
+        "documents": len(documents),
+        "queries": len(queries),
+        "docs_per_second": round(len(documents) * repeat / elapsed, 1),
+        f"recall@{k}": round(float(recall), 4),
+    }
+
+
+def quantize(source: str, target: str) -> None:
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    quantize_dynamic(source, target, weight_type=QuantType.QInt8)
+    logger.info(f"💾 Quantized model written to {target}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description="Embedding tiers")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    bench = sub.add_parser("bench", help="docs/sec and recall@k vs default")
+    bench.add_argument("--provider", default=EMBEDDING_PROVIDER)
+    bench.add_argument("--reduce-dim", type=int, default=EMBEDDING_REDUCE_DIM)
+    bench.add_argument("--k", type=int, default=5)
+    bench.add_argument("--repeat", type=int, default=3)
+
+    quant = sub.add_parser("quantize", help="int8 dynamic quantization")
+    quant.add_argument("--source", default=EMBEDDING_ONNX_MODEL)
+    quant.add_argument("--target", required=True)
+
+    args = parser.parse_args()
+
+    if args.command == "bench":
+        report = benchmark(args.provider, args.reduce_dim, args.k, args.repeat)
+        for key, value in report.items():
+            print(f"{key:>16}: {value}")
+    else:
+        quantize(args.source, args.target)
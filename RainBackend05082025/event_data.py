@@ -0,0 +1,56 @@
+import json
+import logging
+import os
+import re
+from typing import List
+
+from models import PersonProfile
+
+# =========================================================
+# Logging
+# =========================================================
+
+logger = logging.getLogger(__name__)
+
+# =========================================================
+# Configuration
+# =========================================================
+#
+# Kept free of the index stack (numpy, Chroma, embeddings) so offline
+# tools such as `pair_export.py --event` can read event files cheaply.
+
+BASE_DIR = os.path.dirname(__file__)
+DATA_DIR = os.path.join(BASE_DIR, "data")
+
+# Event ids become file names; same characters shards.shard_key keeps
+_EVENT_ID = re.compile(r"[A-Za-z0-9_-]+")
+
+# =========================================================
+# Event data
+# =========================================================
+
+class InvalidEventId(ValueError):
+    pass
+
+
+def event_profiles_path(event_id: str) -> str:
+    if not _EVENT_ID.fullmatch(event_id or ""):
+        raise InvalidEventId(f"Invalid event id {event_id!r}")
+    return os.path.join(DATA_DIR, f"{event_id}_profiles.json")
+
+
+def load_event_profiles(event_id: str) -> List[PersonProfile]:
+    """
+    data/<event_id>_profiles.json -> valid profiles (invalid ones are
+    logged and skipped).
+    """
+    with open(event_profiles_path(event_id), "r", encoding="utf-8") as f:
+        raw = json.load(f)
+
+    profiles = []
+    for item in raw:
+        try:
+            profiles.append(PersonProfile(**item))
+        except Exception as e:
+            logger.error(f"Invalid profile {item}: {e}")
+    return profiles
@@ -0,0 +1,219 @@
+import logging
+import threading
+import time
+from typing import Dict, List, Set
+
+import complementary
+import matchmaking
+import profile_store
+import recommendations
+
+# =========================================================
+# Logging
+# =========================================================
+
+logger = logging.getLogger(__name__)
+
+# =========================================================
+# Configuration (TUNABLE)
+# =========================================================
+
+WORKER_COUNT = 2
+BATCH_SIZE = matchmaking.INDEX_BATCH_SIZE
+BATCH_WINDOW_SECONDS = 0.5   # wait this long to coalesce more updates
+
+# Commits by other processes (e.g. `python bulk_import.py`) are found by
+# polling the store; the margin absorbs small clock differences
+STORE_POLL_SECONDS = 2.0
+STORE_CLOCK_MARGIN_SECONDS = 1.0
+
+# =========================================================
+# Work queue
+# =========================================================
+#
+# Pending work is a set of person ids, not a queue of events: several
+# edits to one profile before a worker gets to it collapse into a single
+# re-embed of its latest state. An id being processed is never picked up
+# by a second worker, so updates to one person are applied in order.
+
+_cond = threading.Condition()
+_dirty: Dict[str, None] = {}   # insertion-ordered set
+_in_flight: Set[str] = set()
+_workers: List[threading.Thread] = []
+_stopping = False
+
+
+def enqueue(person_ids: List[str]) -> None:
+    """
+    Mark profiles as changed. Returns immediately.
+    """
+    with _cond:
+        for pid in person_ids:
+            _dirty[pid] = None
+        _cond.notify_all()
+
+
+def pending() -> int:
+    with _cond:
+        return len(_dirty) + len(_in_flight)
+
+
+def _take_batch() -> List[str]:
+    with _cond:
+        while not _stopping:
+            ready = [pid for pid in _dirty if pid not in _in_flight]
+            if ready:
+                break
+            _cond.wait()
+        else:
+            return []
+
+    # Let bursts of writes accumulate into one batch
+    time.sleep(BATCH_WINDOW_SECONDS)
+
+    with _cond:
+        batch = [
+            pid for pid in _dirty if pid not in _in_flight
+        ][:BATCH_SIZE]
+        for pid in batch:
+            del _dirty[pid]
+            _in_flight.add(pid)
+        return batch
+
+
+def _process(batch: List[str]) -> None:
+    upserts, deletes = [], []
+
+    for pid in batch:
+        person = profile_store.load_person(pid)
+        if person is None:
+            deletes.append(pid)
+        else:
+            upserts.append(person)
+
+    if upserts:
+        matchmaking.upsert_profiles(upserts)
+        if matchmaking.COMPLEMENTARY_ENABLED:
+            # Pre-compute need lookups off the request path
+            complementary.warm([o for p in upserts for o in p.objectives])
+        recommendations.precompute(upserts)
+    if deletes:
+        matchmaking.delete_profiles(deletes)
+        recommendations.forget(deletes)
+
+
+def index_now(person_ids: List[str]) -> None:
+    """
+    Index synchronously on the calling thread, BATCH_SIZE at a time.
+    Warm-up uses this for the initial build, so the service only reports
+    ready once the index (and the caches above) are filled.
+    """
+    for start in range(0, len(person_ids), BATCH_SIZE):
+        _process(person_ids[start:start + BATCH_SIZE])
+
+
+def _run() -> None:
+    while True:
+        batch = _take_batch()
+        if not batch:
+            if _stopping:
+                return
+            continue
+
+        try:
+            _process(batch)
+        except Exception:
+            logger.exception(f"Indexing batch failed: {batch}")
+            # Retry on the next round unless superseded meanwhile
+            with _cond:
+                for pid in batch:
+                    _dirty.setdefault(pid, None)
+        finally:
+            with _cond:
+                _in_flight.difference_update(batch)
+                _cond.notify_all()
+
+# =========================================================
+# Store watcher
+# =========================================================
+#
+# Writes through this server enqueue themselves; this picks up the
+# rest. PRAGMA data_version only changes on other connections' commits,
+# so an idle store costs one pragma per poll.
+
+def _watch_store() -> None:
+    version = profile_store.data_version()
+    since = time.time() - STORE_CLOCK_MARGIN_SECONDS
+
+    while True:
+        time.sleep(STORE_POLL_SECONDS)
+        with _cond:
+            if _stopping:
+                return
+
+        try:
+            current = profile_store.data_version()
+            if current == version:
+                continue
+            checked = time.time()
+            changed = profile_store.changed_ids(since)
+            # Deleted elsewhere: still indexed, gone from the store
+            removed = (
+                set(matchmaking.default_index.documents)
+                - profile_store.all_ids()
+            )
+        except Exception:
+            logger.exception("Store poll failed")
+            continue
+
+        version = current
+        since = checked - STORE_CLOCK_MARGIN_SECONDS
+        if changed or removed:
+            logger.info(
+                f"📬 Store changed outside this server: {len(changed)} "
+                f"updated, {len(removed)} removed"
+            )
+            enqueue(changed + sorted(removed))
+
+# =========================================================
+# Lifecycle
+# =========================================================
+
+def start() -> None:
+    global _stopping
+
+    with _cond:
+        if _workers:
+            return
+        _stopping = False
+
+    # From now on only the workers write to the global index
+    matchmaking.default_index.background_indexing = True
+
+    for i in range(WORKER_COUNT):
+        t = threading.Thread(
+            target=_run, name=f"index-worker-{i}", daemon=True
+        )
+        t.start()
+        _workers.append(t)
+
+    watcher = threading.Thread(
+        target=_watch_store, name="store-watcher", daemon=True
+    )
+    watcher.start()
+    _workers.append(watcher)
+
+    logger.info(f"🧵 Started {WORKER_COUNT} indexing workers")
+
+
+def stop(timeout: float = 5.0) -> None:
+    global _stopping
+
+    with _cond:
+        _stopping = True
+        _cond.notify_all()
+
+    for t in _workers:
+        t.join(timeout)
+    _workers.clear()
+    matchmaking.default_index.background_indexing = False
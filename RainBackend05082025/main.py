@@ -1,13 +1,40 @@
-from fastapi import FastAPI
+import startup_profile  # first: starts the startup clock
+
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import FileResponse
 from pydantic import BaseModel
-from typing import Optional, List
-import os
-import json
-import sys
+from typing import Optional, List, Dict, Any
 import logging
+import os
+import threading
 
+import profile_store
+import request_profiler
 from models import PersonProfile
-from matchmaking import rank_best_matches_per_objective
+
+# Heavy modules (chromadb, numpy, embedding model, index) are imported
+# by the warm-up task after the port is bound, in this order.
+HEAVY_MODULES = [
+    "numpy",
+    "chromadb",
+    "embeddings",
+    "complementary",
+    "matchmaking",
+    "recommendations",
+    "index_workers",
+    "shared_index",
+]
+
+# Not needed by a worker that maps the shared index (INDEX_MODE "shared")
+LOCAL_INDEX_ONLY = {"chromadb", "index_workers"}
+
+# Index mode
+#   "local"  -> each server process builds its own Chroma index and runs
+#               its own index workers (single-worker deployments)
+#   "shared" -> one builder process (`python shared_index.py serve`)
+#               writes the index to disk; every uvicorn worker maps it
+#               read-only, so the page cache holds a single copy
+INDEX_MODE = os.getenv("RAIN_INDEX_MODE", "local")
 
 # =========================================================
 # Logging
@@ -22,157 +49,435 @@ logger = logging.getLogger(__name__)
 
 app = FastAPI(title="RAIN Networking Assistant")
 
-# =========================================================
-# Paths
-# =========================================================
-
-if getattr(sys, "frozen", False):
-    BASE_DIR = os.path.dirname(sys.executable)
-else:
-    BASE_DIR = os.path.dirname(__file__)
-
-DATA_DIR = os.path.join(BASE_DIR, "data")
 # =========================================================
 # Request Model
 # =========================================================
 class ChatRequest(BaseModel):
     user_id: str
     message: Optional[str] = None
-# =========================================================
-# JSON helpers
-# =========================================================
-def load_json(filename: str):
-    path = os.path.join(DATA_DIR, filename)
-    if not os.path.exists(path):
-        logger.warning(f"Missing data file: {path}")
-        return []
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
-# =========================================================
-# FIELD MAPPERS
-# =========================================================
+    event_id: Optional[str] = None   # route to that event's shard
+
 
-def extract_skills(p: dict) -> List[str]:
+class ProfileWrite(BaseModel):
     """
-    top_skills -> ["Capital markets technology", ...]
+    Raw profile in the people_profiles schema
+    (current_role, top_skills, solutions_offered, ...).
     """
-    return [
-        s.get("skill")
-        for s in p.get("top_skills", [])
-        if isinstance(s, dict) and s.get("skill")
-    ]
+    id: str
+    name: str
+    objectives: Optional[List[str]] = None
 
+    class Config:
+        extra = "allow"
 
-def extract_solutions(p: dict) -> List[str]:
+
+class ProfilePatch(BaseModel):
     """
-    solutions_offered -> list[str]
+    Partial profile (people_profiles schema); only the fields sent
+    are changed.
     """
-    return [
-        s for s in p.get("solutions_offered", [])
-        if isinstance(s, str)
-    ]
+    objectives: Optional[List[str]] = None
 
+    class Config:
+        extra = "allow"
 
-def extract_bio(p: dict) -> str:
-    """
-    Build a semantic bio from current_role
-    """
-    role = p.get("current_role", {}) or {}
-    title = role.get("title", "")
-    company = role.get("company", "")
-    location = role.get("location", "")
 
-    parts = [title, company, location]
-    return " | ".join([x for x in parts if x])
+class ObjectivesWrite(BaseModel):
+    objectives: List[str]
 
 
-def extract_role(p: dict) -> str:
-    """
-    Normalize role using ROLE_TAXONOMY
-    """
-    role = p.get("current_role", {}) or {}
-    title = role.get("title", "")
-    return title
+class ImportRequest(BaseModel):
+    path: str                      # .xlsx or .csv readable by the server
+    sheet: Optional[str] = None
+    split_objectives: bool = False  # one objective per ";" / line
 
 # =========================================================
 # Load user
 # =========================================================
 
 def load_user(user_id: str) -> PersonProfile | None:
-    people = load_json("people_profiles_updated.json")
-    objectives = load_json("userProfileNetworkingObjectives_updated.json")
-
-    person = next((p for p in people if p["id"] == user_id), None)
-    if not person:
-        return None
-
-    user_objectives = next(
-        (o["objectives"] for o in objectives if o["user_id"] == user_id),
-        []
-    )
-
-    return PersonProfile(
-        id=person["id"],
-        name=person["name"],
-        role=extract_role(person),
-        bio=extract_bio(person),
-        skills=extract_skills(person),
-        solutions=extract_solutions(person),
-        objectives=user_objectives
-    )
+    return profile_store.load_person(user_id)
 
 # =========================================================
 # Load candidates
 # =========================================================
 
 def load_candidates(user_id: str) -> List[PersonProfile]:
-    people = load_json("people_profiles_updated.json")
-    objectives = load_json("userProfileNetworkingObjectives_updated.json")
-
-    candidates: List[PersonProfile] = []
+    candidates: List[PersonProfile] = [
+        p for p in profile_store.list_persons() if p.id != user_id
+    ]
 
-    for p in people:
-        if p["id"] == user_id:
-            continue
+    logger.info(f"Loaded {len(candidates)} candidates")
+    return candidates
 
-        person_objectives = next(
-            (o["objectives"] for o in objectives if o["user_id"] == p["id"]),
-            []
-        )
+# =========================================================
+# Routes
+# =========================================================
 
-        candidates.append(
-            PersonProfile(
-                id=p["id"],
-                name=p["name"],
-                role=extract_role(p),
-                bio=extract_bio(p),
-                skills=extract_skills(p),
-                solutions=extract_solutions(p),
-                objectives=person_objectives
+@app.post("/chat")
+def chat(request: ChatRequest, response: Response, http_request: Request):
+    if not startup_profile.is_ready():
+        response.status_code = 503
+        return {"error": "Service warming up"}
+
+    if not request_profiler.should_capture(
+        http_request.headers, http_request.query_params
+    ):
+        return _chat(request)
+
+    with request_profiler.capture(f"chat-{request.user_id}") as capture:
+        result = _chat(request)
+    if capture.id:
+        response.headers["X-Profile-Id"] = capture.id
+    return result
+
+
+def _chat(request: ChatRequest):
+    import recommendations
+    from matchmaking import rank_best_matches_per_objective
+
+    if request.event_id:
+        import shards
+        from event_data import InvalidEventId
+        try:
+            shard = shards.acquire_shard(request.event_id)
+        except InvalidEventId:
+            return {"error": "Invalid event id"}
+        except FileNotFoundError:
+            return {"error": "Event not found"}
+
+        # Held until ranking is done, so eviction cannot drop the index
+        try:
+            user = shard.person(request.user_id)
+            if not user:
+                return {"error": "User not found"}
+
+            matches = rank_best_matches_per_objective(
+                user, shard.candidates_for(user.id), debug=True,
+                index=shard.index,
             )
+        finally:
+            shard.release()
+    else:
+        user = load_user(request.user_id)
+        if not user:
+            return {"error": "User not found"}
+
+        candidates = load_candidates(user.id)
+        matches = rank_best_matches_per_objective(
+            user, candidates, debug=True
         )
 
-    logger.info(f"Loaded {len(candidates)} candidates")
-    return candidates
+    return {
+        "user_id": user.id,
+        "matches": matches,
+        "recommendations": recommendations.recommend(user),
+    }
 
 # =========================================================
-# Routes
+# Startup / health
 # =========================================================
+#
+# Startup only spawns the warm-up thread, so uvicorn binds the port
+# right away. /healthz answers as soon as the process is listening;
+# /readyz only once the initial index is built and the workers are
+# running.
+#
+# With RAIN_INDEX_MODE=shared (several uvicorn workers) no worker builds
+# an index: `python shared_index.py serve` does, and each worker maps
+# its published generations read-only.
+
+def _shared_index_mode() -> bool:
+    return INDEX_MODE == "shared"
+
+
+def _warm_up():
+    try:
+        shared = _shared_index_mode()
+
+        with startup_profile.phase("imports"):
+            for name in HEAVY_MODULES:
+                if not (shared and name in LOCAL_INDEX_ONLY):
+                    startup_profile.timed_import(name)
+
+        import complementary
+        import embeddings
+        import matchmaking
+        import recommendations
+        import shared_index
+
+        if shared:
+            # The builder process indexes; this worker maps its output
+            with startup_profile.phase("open_index"):
+                shared_index.attach()
+                embeddings.get_provider().embed(["warm-up"])
+        else:
+            with startup_profile.phase("open_index"):
+                matchmaking.warm_up()
+        with startup_profile.phase("recommendation_catalogs"):
+            recommendations.load_catalogs()
+        if matchmaking.COMPLEMENTARY_ENABLED:
+            with startup_profile.phase("objective_graph"):
+                complementary.load_graph()
+
+        if shared:
+            # No index workers in this process: fill the per-user caches
+            # they would have filled (need mappings, recommendations)
+            with startup_profile.phase("user_caches"):
+                persons = profile_store.list_persons()
+                if matchmaking.COMPLEMENTARY_ENABLED:
+                    complementary.warm(
+                        [o for p in persons for o in p.objectives]
+                    )
+                recommendations.precompute(persons)
+        else:
+            import index_workers
+            # Initial build before reporting ready, so the first /chat
+            # does not index synchronously against an empty index
+            with startup_profile.phase("initial_index"):
+                index_workers.index_now(
+                    [p["id"] for p in profile_store.list_profiles()]
+                )
+            index_workers.start()
+
+        startup_profile.mark_ready()
+        startup_profile.log_report()
+    except Exception as e:
+        logger.exception("Warm-up failed")
+        startup_profile.mark_failed(str(e))
+
+
+@app.on_event("startup")
+def start_warm_up():
+    startup_profile.mark("listening")
+    threading.Thread(target=_warm_up, name="warm-up", daemon=True).start()
+
+
+@app.on_event("shutdown")
+def stop_index_workers():
+    if startup_profile.is_ready() and not _shared_index_mode():
+        import index_workers
+        index_workers.stop()
+
+
+@app.get("/healthz")
+def healthz():
+    return {"status": "ok"}
+
+
+@app.get("/readyz")
+def readyz(response: Response):
+    if not startup_profile.is_ready():
+        response.status_code = 503
+        return {"status": "warming up"}
+    return {"status": "ready"}
+
+
+@app.get("/startup-profile")
+def startup_report():
+    return startup_profile.report()
 
-@app.post("/chat")
-def chat(request: ChatRequest):
-    user = load_user(request.user_id)
-    if not user:
+# =========================================================
+# Profile delta ingestion
+# =========================================================
+#
+# Writes go to the durable profile store and only ENQUEUE re-embedding;
+# the background index workers batch them into the live index (or, in
+# shared index mode, the builder process notices the commit).
+
+def enqueue_reindex(person_ids: List[str]) -> None:
+    if _shared_index_mode():
+        return  # the shared index builder picks up store commits itself
+    import index_workers
+    index_workers.enqueue(person_ids)
+
+
+@app.post("/profiles")
+def create_profile(profile: ProfileWrite):
+    data = profile.dict(exclude={"objectives"})
+    profile_store.upsert_profile(data)
+    if profile.objectives is not None:
+        profile_store.set_objectives(profile.id, profile.objectives)
+
+    enqueue_reindex([profile.id])
+    return {"status": "accepted", "id": profile.id}
+
+
+@app.patch("/profiles/{person_id}")
+def update_profile(person_id: str, patch: ProfilePatch):
+    changes = patch.dict(exclude_unset=True)
+    objectives = changes.pop("objectives", None)
+
+    merged = profile_store.patch_profile(person_id, changes)
+    if merged is None:
         return {"error": "User not found"}
+    if objectives is not None:
+        profile_store.set_objectives(person_id, objectives)
 
-    candidates = load_candidates(user.id)
+    enqueue_reindex([person_id])
+    return {"status": "accepted", "id": person_id}
 
-    matches = rank_best_matches_per_objective(user, candidates,debug=True)
 
-    return {
-        "user_id": user.id,
-        "matches": matches
-    }
+@app.delete("/profiles/{person_id}")
+def delete_profile(person_id: str):
+    if not profile_store.delete_profile(person_id):
+        return {"error": "User not found"}
+
+    enqueue_reindex([person_id])
+    return {"status": "accepted", "id": person_id}
+
+
+@app.post("/profiles/{person_id}/objectives")
+def replace_objectives(person_id: str, body: ObjectivesWrite):
+    if profile_store.get_profile(person_id) is None:
+        return {"error": "User not found"}
+
+    profile_store.set_objectives(person_id, body.objectives)
+    enqueue_reindex([person_id])
+    return {"status": "accepted", "id": person_id}
+
+
+@app.patch("/profiles/{person_id}/objectives")
+def add_objectives(person_id: str, body: ObjectivesWrite):
+    if profile_store.get_profile(person_id) is None:
+        return {"error": "User not found"}
+
+    current = profile_store.get_objectives(person_id)
+    merged = current + [o for o in body.objectives if o not in current]
+    profile_store.set_objectives(person_id, merged)
+    enqueue_reindex([person_id])
+    return {"status": "accepted", "id": person_id}
+
+
+@app.delete("/profiles/{person_id}/objectives")
+def clear_objectives(person_id: str):
+    if not profile_store.delete_objectives(person_id):
+        return {"error": "Objectives not found"}
+
+    enqueue_reindex([person_id])
+    return {"status": "accepted", "id": person_id}
+
+
+@app.get("/index/status")
+def index_status(response: Response):
+    # Before warm-up neither the mapped index nor the workers exist
+    if not startup_profile.is_ready():
+        response.status_code = 503
+        return {"error": "Service warming up"}
+
+    if _shared_index_mode():
+        import matchmaking
+        return {
+            "mode": "shared",
+            "generation": matchmaking.default_index.generation,
+            "profiles": matchmaking.default_index.count(),
+        }
+    import index_workers
+    return {"pending_updates": index_workers.pending()}
+
+# =========================================================
+# Admin: request profiles
+# =========================================================
+#
+# Send X-Admin-Token plus `X-Profile: 1` (or `?profile=1`) with a /chat
+# call to capture it; RAIN_PROFILE_SAMPLE_RATE captures a fraction of
+# all calls. Captures are .folded (flamegraph.pl) and .speedscope.json.
+
+@app.get("/admin/profiles")
+def list_request_profiles(http_request: Request, response: Response):
+    if not request_profiler.is_admin(http_request.headers):
+        response.status_code = 403
+        return {"error": "Forbidden"}
+    return {"profiles": request_profiler.list_captures()}
+
+
+@app.get("/admin/profiles/{filename}")
+def download_request_profile(
+    filename: str, http_request: Request, response: Response
+):
+    if not request_profiler.is_admin(http_request.headers):
+        response.status_code = 403
+        return {"error": "Forbidden"}
+
+    path = request_profiler.capture_path(filename)
+    if path is None:
+        response.status_code = 404
+        return {"error": "Profile not found"}
+    return FileResponse(path, filename=filename)
+
+# =========================================================
+# Admin: bulk import
+# =========================================================
+#
+# Streams a spreadsheet into the profile store in batches; each batch
+# is enqueued for indexing like a regular profile write. Runs in the
+# background, progress at GET /admin/import.
+
+_import_lock = threading.Lock()
+_import_state: Dict[str, Any] = {"running": False, "last": None}
+
+
+def _run_import(body: ImportRequest):
+    import bulk_import
+
+    try:
+        report = bulk_import.import_file(
+            body.path, body.sheet, on_batch=enqueue_reindex,
+            split_objectives=body.split_objectives,
+        )
+        _import_state["last"] = report.as_dict()
+    except Exception as e:
+        logger.exception(f"Import of {body.path} failed")
+        _import_state["last"] = {"source": body.path, "error": str(e)}
+    finally:
+        _import_state["running"] = False
+
+
+@app.post("/admin/import")
+def start_import(
+    body: ImportRequest, http_request: Request, response: Response
+):
+    if not request_profiler.is_admin(http_request.headers):
+        response.status_code = 403
+        return {"error": "Forbidden"}
+    if not os.path.isfile(body.path):
+        response.status_code = 404
+        return {"error": "File not found"}
+
+    with _import_lock:
+        if _import_state["running"]:
+            response.status_code = 409
+            return {"error": "An import is already running"}
+        _import_state["running"] = True
+
+    threading.Thread(
+        target=_run_import, args=(body,), name="bulk-import", daemon=True
+    ).start()
+    return {"status": "started", "path": body.path}
+
+
+@app.get("/admin/import")
+def import_status(http_request: Request, response: Response):
+    if not request_profiler.is_admin(http_request.headers):
+        response.status_code = 403
+        return {"error": "Forbidden"}
+    return _import_state
+
+# =========================================================
+# Event shards
+# =========================================================
+
+@app.get("/events/shards")
+def event_shards():
+    import shards
+    return {"loaded": shards.manager.stats()}
+
+
+@app.post("/events/{event_id}/reindex")
+def reindex_event(event_id: str):
+    import shards
+    shards.reindex_shard(event_id)
+    return {"status": "invalidated", "event_id": event_id}
 
 # =========================================================
 # Run (local)
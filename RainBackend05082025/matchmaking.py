@@ -1,11 +1,15 @@
 import csv
 import logging
+import math
 import os
-from typing import List, Dict
+import threading
+from typing import List, Dict, Optional
 
-import chromadb
-from chromadb.config import Settings
+import numpy as np
 
+import bm25
+import embeddings
+import complementary
 from models import PersonProfile
 
 # =========================================================
@@ -32,25 +36,111 @@ BIO_REPEAT = 2   # weakest signal
 CHROMA_RECALL_K = 7
 RETURN_TOP_K = 5
 
+# Retrieval mode (fixed recall only)
+#   "dense"  -> vector search alone, CHROMA_RECALL_K deep
+#   "hybrid" -> the same vector search plus BM25 over skills /
+#               solutions / applied_in, merged with reciprocal-rank
+#               fusion; exact-term hits are added, never swapped in for
+#               dense ones, and the fused rank feeds the semantic score
+RETRIEVAL_MODE = "dense"
+HYBRID_DENSE_K = CHROMA_RECALL_K
+HYBRID_LEXICAL_K = 5
+RRF_K = 60
+HYBRID_FUSION_WEIGHT = 0.5   # semantic = blend of dense score and RRF
+
+# Scoring mode
+#   "normalized" -> 1/(1+d), divided by the sum over the recalled results
+#   "cosine"     -> calibrated cosine similarity (comparable across queries)
+SCORING_MODE = "normalized"
+MIN_SCORE = 0.0          # cosine mode only: prune candidates below this
+AGGREGATION = "sum"      # "sum" | "max" | "softmax"
+SOFTMAX_TEMPERATURE = 0.1
+
+# Recall mode
+#   "fixed"    -> CHROMA_RECALL_K per objective
+#   "adaptive" -> start small, widen until the top-k is provably final
+#                 (threshold algorithm; requires SCORING_MODE = "cosine")
+RECALL_MODE = "fixed"
+ADAPTIVE_INITIAL_K = 5
+ADAPTIVE_GROWTH = 2
+
 # Scoring weights
 SEMANTIC_WEIGHT = 0.9
 ROLE_WEIGHT = 0.0   # soft preference only
 
+# Complementary (reciprocal) matching, opt-in: an objective's
+# complementary offers (data/complementary_objectives.json) are searched
+# against candidates' own objectives, kept in a second collection.
+# Offer hits below COMPLEMENTARY_MIN_SIMILARITY (cosine) are ignored; in
+# normalized mode the rest are normalized per objective like the
+# semantic scores, so neither term dwarfs the other.
+COMPLEMENTARY_ENABLED = False
+OBJECTIVES_COLLECTION_NAME = "people_objectives"
+COMPLEMENTARY_RECALL_K = 10
+COMPLEMENTARY_MIN_SIMILARITY = 0.5
+COMPLEMENTARY_WEIGHT = 0.3
+
+# Indexing
+INDEX_BATCH_SIZE = 64
+
 # Debugging
 DEBUG_CSV = "matchmaking_debug.csv"
-REINDEX_EVERY_RUN = True
+# Rows with the extra complementary_score column (complementary enabled)
+DEBUG_CSV_COMPLEMENTARY = "matchmaking_debug_complementary.csv"
+REINDEX_EVERY_RUN = False   # True: rebuild the collection on every request
 
 # =========================================================
 # ChromaDB Client
 # =========================================================
 
-chroma_client = chromadb.Client(
-    Settings(persist_directory=CHROMA_DIR)
-)
+# Created lazily by get_client(): importing chromadb and creating the
+# client is most of this module's cold-start cost.
+chroma_client = None
+_open_lock = threading.Lock()
+
+
+def _collection_metadata():
+    """
+    Cosine mode needs the HNSW index in cosine space so that
+    distance == 1 - cosine similarity on normalized embeddings.
+    """
+    if SCORING_MODE == "cosine":
+        return {"hnsw:space": "cosine"}
+    return None
+
+
+def get_client():
+    """
+    Shared Chroma client, created on first use.
+
+    Vectors from embeddings.get_provider() are always passed to Chroma
+    explicitly, so Chroma's own embedding function is never invoked.
+    """
+    global chroma_client
+
+    if chroma_client is None:
+        with _open_lock:
+            if chroma_client is None:
+                import chromadb
+                from chromadb.config import Settings
+
+                chroma_client = chromadb.Client(
+                    Settings(persist_directory=CHROMA_DIR)
+                )
+    return chroma_client
+
+
+def open_index() -> None:
+    default_index.open()
 
-collection = chroma_client.get_or_create_collection(
-    name=COLLECTION_NAME
-)
+
+def warm_up() -> None:
+    """
+    Open the index and load the embedding model ahead of the first
+    request (run from the server's warm-up task).
+    """
+    open_index()
+    embeddings.get_provider().embed(["warm-up"])
 
 # =========================================================
 # Document Construction (Embeddings Only)
@@ -81,33 +171,448 @@ def profile_to_document(p: PersonProfile) -> str:
 
     return "\n".join(sections).strip()
 
+
+def lexical_text(p: PersonProfile) -> str:
+    """
+    BM25 document: the exact wording of skills, solutions and where
+    the skills were applied (no repetition, no bio).
+    """
+    return "\n".join(
+        list(p.skills or [])
+        + list(p.solutions or [])
+        + list(p.applied_in or [])
+    )
+
 # =========================================================
 # Indexing
 # =========================================================
 
-def ensure_indexed(candidates: List[PersonProfile]) -> None:
-    global collection
+def _objective_ids(person_id: str, clauses: List[str]) -> List[str]:
+    return [f"{person_id}::{n}" for n in range(len(clauses))]
 
-    if REINDEX_EVERY_RUN:
-        logger.info("🔄 Resetting Chroma collection")
-        try:
-            chroma_client.delete_collection(name=COLLECTION_NAME)
-        except Exception:
-            pass
 
-        collection = chroma_client.get_or_create_collection(
-            name=COLLECTION_NAME
+def objective_clauses(p: PersonProfile) -> List[str]:
+    return [
+        c for o in p.objectives or []
+        for c in complementary.split_objective(o)
+    ]
+
+
+class ProfileIndex:
+    """
+    One searchable set of profiles: the profile collection, the
+    objectives collection used for complementary matching, and the
+    documents currently embedded in them.
+
+    Writers are serialized by `lock`. Embeddings are computed outside
+    the lock and each batch lands with a single upsert, so readers
+    (which do not lock) see a batch either fully applied or not at all.
+
+    With `background_indexing` set (index workers own this index),
+    requests never write to it; see ensure_indexed().
+    """
+
+    def __init__(self, collection_name: str, objectives_collection_name: str):
+        self.collection_name = collection_name
+        self.objectives_collection_name = objectives_collection_name
+        self.collection = None
+        self.objectives_collection = None
+        self.lock = threading.RLock()
+        self.dimension = 0
+        self.background_indexing = False
+
+        # id -> document currently embedded in the collection
+        self.documents: Dict[str, str] = {}
+        # id -> objective clauses currently in objectives_collection
+        self.objectives: Dict[str, List[str]] = {}
+        # Sparse side of hybrid retrieval, kept in step with the above
+        self.lexical = bm25.BM25Index()
+
+    # -----------------------------------------------------
+    # Lifecycle
+    # -----------------------------------------------------
+
+    def open(self) -> "ProfileIndex":
+        if self.collection is not None:
+            return self
+
+        with self.lock:
+            if self.collection is None:
+                client = get_client()
+                # Candidates' objectives, one entry per clause:
+                # "{person_id}::{n}"
+                self.objectives_collection = client.get_or_create_collection(
+                    name=self.objectives_collection_name,
+                    metadata={"hnsw:space": "cosine"},
+                )
+                self.collection = client.get_or_create_collection(
+                    name=self.collection_name,
+                    metadata=_collection_metadata(),
+                )
+        return self
+
+    def drop(self) -> None:
+        """
+        Delete both collections and forget their contents.
+        """
+        with self.lock:
+            client = get_client()
+            for name in (
+                self.collection_name, self.objectives_collection_name
+            ):
+                try:
+                    client.delete_collection(name=name)
+                except Exception:
+                    pass
+
+            self.collection = None
+            self.objectives_collection = None
+            self.documents.clear()
+            self.objectives.clear()
+            self.lexical.clear()
+
+    def reset(self) -> None:
+        logger.info(f"🔄 Resetting Chroma collection {self.collection_name}")
+        with self.lock:
+            self.drop()
+            self.open()
+
+    def memory_bytes(self) -> int:
+        """
+        Rough footprint: float32 vectors for profiles and clauses.
+        """
+        vectors = len(self.documents) + sum(
+            len(c) for c in self.objectives.values()
+        )
+        return vectors * self.dimension * 4
+
+    # -----------------------------------------------------
+    # Snapshots (shard matrix files)
+    # -----------------------------------------------------
+
+    def export_arrays(self) -> Dict[str, np.ndarray]:
+        """
+        Everything embedded in this index as plain arrays, so it can be
+        saved and reloaded without re-embedding.
+        """
+
+        self.open()
+        profile_ids = list(self.documents)
+        ids, vectors = (
+            self.fetch_embeddings(profile_ids) if profile_ids
+            else ([], np.zeros((0, self.dimension), dtype=np.float32))
+        )
+        order = {pid: row for row, pid in enumerate(ids)}
+        vectors = vectors[[order[pid] for pid in profile_ids]]
+
+        clause_ids, owners, clauses = [], [], []
+        for pid, person_clauses in self.objectives.items():
+            clause_ids.extend(_objective_ids(pid, person_clauses))
+            owners.extend(pid for _ in person_clauses)
+            clauses.extend(person_clauses)
+
+        clause_vectors = np.zeros((0, vectors.shape[1]), dtype=np.float32)
+        if clause_ids:
+            fetched = self.objectives_collection.get(
+                ids=clause_ids, include=["embeddings"]
+            )
+            order = {cid: row for row, cid in enumerate(fetched["ids"])}
+            clause_vectors = np.asarray(
+                fetched["embeddings"], dtype=np.float32
+            )[[order[cid] for cid in clause_ids]]
+
+        return {
+            "profile_ids": np.asarray(profile_ids, dtype=str),
+            "documents": np.asarray(
+                [self.documents[pid] for pid in profile_ids], dtype=str
+            ),
+            "vectors": vectors.astype(np.float32),
+            "clause_owners": np.asarray(owners, dtype=str),
+            "clauses": np.asarray(clauses, dtype=str),
+            "clause_vectors": clause_vectors,
+        }
+
+    def import_arrays(
+        self,
+        arrays: Dict[str, np.ndarray],
+        profiles: List[PersonProfile],
+    ) -> int:
+        """
+        Load saved vectors for profiles whose document and objective
+        clauses are unchanged. Returns the number of profiles restored;
+        the rest are left for upsert_profiles() to embed.
+        """
+
+        current = {p.id: p for p in profiles}
+
+        ids, documents, rows = [], [], []
+        for row, (pid, doc) in enumerate(
+            zip(arrays["profile_ids"], arrays["documents"])
+        ):
+            pid, doc = str(pid), str(doc)
+            p = current.get(pid)
+            if p is not None and profile_to_document(p) == doc:
+                ids.append(pid)
+                documents.append(doc)
+                rows.append(row)
+
+        if ids:
+            self.load_vectors(ids, documents, arrays["vectors"][rows])
+
+        saved_clauses: Dict[str, List[int]] = {}
+        for row, owner in enumerate(arrays["clause_owners"]):
+            saved_clauses.setdefault(str(owner), []).append(row)
+
+        batch, clause_ids, clauses, clause_rows, metadatas = [], [], [], [], []
+        for pid, row_list in saved_clauses.items():
+            p = current.get(pid)
+            saved = [str(arrays["clauses"][r]) for r in row_list]
+            if p is None or objective_clauses(p) != saved:
+                continue
+            batch.append((pid, saved))
+            clause_ids.extend(_objective_ids(pid, saved))
+            clauses.extend(saved)
+            clause_rows.extend(row_list)
+            metadatas.extend({"person_id": pid} for _ in saved)
+
+        if batch:
+            self.open()
+            self._write_objectives(
+                batch, clause_ids, clauses,
+                arrays["clause_vectors"][clause_rows].tolist(), metadatas,
+            )
+
+        return len(ids)
+
+    # -----------------------------------------------------
+    # Reads
+    # -----------------------------------------------------
+
+    def count(self) -> int:
+        return self.open().collection.count()
+
+    def query(self, query_embedding: np.ndarray, n_results: int):
+        """
+        Nearest profiles: (ids, distances), sorted by distance.
+        """
+        if n_results <= 0:
+            return [], []
+        results = self.open().collection.query(
+            query_embeddings=[np.asarray(query_embedding).tolist()],
+            n_results=n_results,
+            include=["distances"],
         )
+        return results["ids"][0], results["distances"][0]
 
-    documents, ids = [], []
+    def fetch_embeddings(self, ids: List[str]):
+        """
+        Stored vectors for random access: (ids, matrix), in the order
+        the store returns them.
+        """
+        fetched = self.open().collection.get(
+            ids=list(ids), include=["embeddings"]
+        )
+        return fetched["ids"], np.asarray(
+            fetched["embeddings"], dtype=np.float32
+        )
 
-    for c in candidates:
-        documents.append(profile_to_document(c))
-        ids.append(c.id)
+    def query_objectives(self, query_embeddings: np.ndarray, n_results: int):
+        """
+        Nearest objective clauses per query vector:
+        (person ids per query, distances per query).
+        """
+        results = self.open().objectives_collection.query(
+            query_embeddings=np.asarray(query_embeddings).tolist(),
+            n_results=n_results,
+            include=["distances", "metadatas"],
+        )
+        people = [
+            [m["person_id"] for m in metadatas]
+            for metadatas in results["metadatas"]
+        ]
+        return people, results["distances"]
 
-    if documents:
-        collection.add(documents=documents, ids=ids)
-        logger.info(f"✅ Indexed {len(documents)} profiles")
+    # -----------------------------------------------------
+    # Writes
+    # -----------------------------------------------------
+
+    def upsert_objectives(self, profiles: List[PersonProfile]) -> int:
+        """
+        Keep the objectives collection in sync with the profiles'
+        objectives. Only people whose clauses changed are re-embedded.
+        """
+
+        self.open()
+
+        changed = [
+            (p.id, clauses) for p in profiles
+            for clauses in [objective_clauses(p)]
+            if self.objectives.get(p.id) != clauses
+        ]
+        if not changed:
+            return 0
+
+        for start in range(0, len(changed), INDEX_BATCH_SIZE):
+            batch = changed[start:start + INDEX_BATCH_SIZE]
+
+            ids, documents, metadatas = [], [], []
+            for pid, clauses in batch:
+                ids.extend(_objective_ids(pid, clauses))
+                documents.extend(clauses)
+                metadatas.extend({"person_id": pid} for _ in clauses)
+
+            vectors = (
+                embeddings.get_provider().embed(documents).tolist()
+                if documents else []
+            )
+            self._write_objectives(batch, ids, documents, vectors, metadatas)
+
+        return len(changed)
+
+    def _write_objectives(self, batch, ids, documents, vectors, metadatas):
+        with self.lock:
+            stale = [
+                i for pid, _ in batch
+                for i in _objective_ids(pid, self.objectives.get(pid, []))
+            ]
+            if stale:
+                self.objectives_collection.delete(ids=stale)
+            if ids:
+                self.objectives_collection.upsert(
+                    ids=ids,
+                    documents=documents,
+                    embeddings=vectors,
+                    metadatas=metadatas,
+                )
+            self.objectives.update(batch)
+
+    def upsert_profiles(self, profiles: List[PersonProfile]) -> int:
+        """
+        Embed and upsert profiles whose document changed since they
+        were last indexed. Unchanged profiles cost nothing. Returns the
+        number of profiles (re-)embedded.
+        """
+
+        self.open()
+
+        if COMPLEMENTARY_ENABLED:
+            self.upsert_objectives(profiles)
+
+        for p in profiles:
+            self.lexical.upsert(p.id, lexical_text(p))
+
+        documents, ids = [], []
+
+        for p in profiles:
+            doc = profile_to_document(p)
+            if self.documents.get(p.id) != doc:
+                documents.append(doc)
+                ids.append(p.id)
+
+        if not documents:
+            return 0
+
+        for start in range(0, len(documents), INDEX_BATCH_SIZE):
+            batch_ids = ids[start:start + INDEX_BATCH_SIZE]
+            batch_docs = documents[start:start + INDEX_BATCH_SIZE]
+            batch_vectors = embeddings.get_provider().embed(batch_docs)
+            self.load_vectors(batch_ids, batch_docs, batch_vectors)
+
+        logger.info(
+            f"✅ Indexed {len(documents)} profiles into {self.collection_name}"
+        )
+        return len(documents)
+
+    def load_vectors(
+        self,
+        ids: List[str],
+        documents: List[str],
+        vectors: np.ndarray,
+    ) -> None:
+        """
+        Upsert profiles whose embeddings are already known (e.g. read
+        back from a shard's matrix file). No embedding calls.
+        """
+
+        self.open()
+        if not ids:
+            return
+
+        with self.lock:
+            self.collection.upsert(
+                ids=list(ids),
+                documents=list(documents),
+                embeddings=np.asarray(vectors).tolist(),
+            )
+            self.documents.update(zip(ids, documents))
+            self.dimension = int(np.asarray(vectors).shape[1])
+
+    def delete_profiles(self, ids: List[str]) -> int:
+        self.open()
+
+        with self.lock:
+            for i in ids:
+                self.lexical.remove(i)
+
+            present = [i for i in ids if i in self.documents]
+            if present:
+                self.collection.delete(ids=present)
+                for i in present:
+                    self.documents.pop(i, None)
+
+            stale = [
+                oid for i in ids
+                for oid in _objective_ids(i, self.objectives.pop(i, []))
+            ]
+            if stale:
+                self.objectives_collection.delete(ids=stale)
+
+        if present:
+            logger.info(
+                f"🗑️ Removed {len(present)} profiles from "
+                f"{self.collection_name}"
+            )
+        return len(present)
+
+    def ensure_indexed(self, candidates: List[PersonProfile]) -> None:
+        """
+        Request-path indexing. With background indexing this does
+        nothing: the workers hold the latest version of every profile,
+        and writing the request's copy could overwrite a newer one or
+        re-add a deleted one. Otherwise (event shards) only candidates
+        missing from the index are embedded; changed ones are refreshed
+        by the shard's own rebuild.
+        """
+
+        if REINDEX_EVERY_RUN:
+            with self.lock:
+                self.reset()
+            self.upsert_profiles(candidates)
+            return
+
+        if self.background_indexing:
+            return
+
+        missing = [c for c in candidates if c.id not in self.documents]
+        if missing:
+            self.upsert_profiles(missing)
+
+
+# Global index (all profiles in the profile store). Per-event indexes
+# live in shards.py.
+default_index = ProfileIndex(COLLECTION_NAME, OBJECTIVES_COLLECTION_NAME)
+
+
+def upsert_profiles(profiles: List[PersonProfile]) -> int:
+    return default_index.upsert_profiles(profiles)
+
+
+def delete_profiles(ids: List[str]) -> int:
+    return default_index.delete_profiles(ids)
+
+
+def ensure_indexed(candidates: List[PersonProfile]) -> None:
+    default_index.ensure_indexed(candidates)
 
 # =========================================================
 # Role Scoring (NO embeddings, NO Chroma)
@@ -157,114 +662,603 @@ def compute_role_alignment_score(
     # Normalize by objective length
     return min(len(overlap) / max(len(objective_words), 1), 1.0)
 
+# =========================================================
+# Semantic Scoring
+# =========================================================
+
+def semantic_scores(distances: List[float]) -> List[float]:
+    """
+    Convert Chroma distances into semantic scores.
+
+    normalized: 1/(1+d) divided by the sum over this query's results
+                (relative within one query only)
+    cosine:     1 - d in cosine space, i.e. the cosine similarity,
+                clamped at 0 so scores are comparable across queries
+    """
+
+    if SCORING_MODE == "cosine":
+        return [max(0.0, 1.0 - d) for d in distances]
+
+    raw = [1 / (1 + d) for d in distances]
+    total_raw = sum(raw) or 1.0
+    return [r / total_raw for r in raw]
+
+
+def objective_query(objective: str) -> str:
+    return (
+        "I want someone who can help me achieve "
+        f"the following objective: {objective}"
+    )
+
+
+def embed_queries(queries: List[str]) -> np.ndarray:
+    """
+    Embed all objective queries in one batch, L2-normalized.
+    """
+    return embeddings.get_provider().embed(queries)
+
+
+def passes_min_score(similarity: float) -> bool:
+    return MIN_SCORE <= 0 or similarity >= MIN_SCORE
+
+
+def recall_objective(
+    index: ProfileIndex, query_embedding: np.ndarray, n_results: int
+):
+    """
+    Semantic recall for one objective query.
+
+    In cosine mode MIN_SCORE is translated into a maximum distance,
+    and results past it are dropped before any further scoring.
+    Chroma returns results sorted by distance, so the cut is a prefix.
+    """
+
+    ids, distances = index.query(query_embedding, n_results)
+
+    if SCORING_MODE == "cosine" and MIN_SCORE > 0:
+        max_distance = 1.0 - MIN_SCORE
+        keep = 0
+        while keep < len(distances) and distances[keep] <= max_distance:
+            keep += 1
+        ids, distances = ids[:keep], distances[:keep]
+
+    return ids, distances
+
+
+def _distances_to(
+    index: ProfileIndex, ids: List[str], query_embedding: np.ndarray
+) -> Dict[str, float]:
+    """
+    Exact distances, in the collection's own metric, for profiles the
+    vector search did not return (unit vectors: cosine space gives
+    1 - cos, Chroma's default squared L2 gives 2 - 2 cos).
+    """
+    if not ids:
+        return {}
+
+    fetched_ids, vectors = index.fetch_embeddings(ids)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    sims = (vectors / np.maximum(norms, 1e-12)) @ query_embedding
+    scale = 1.0 if SCORING_MODE == "cosine" else 2.0
+    return {
+        cid: scale * (1.0 - float(s)) for cid, s in zip(fetched_ids, sims)
+    }
+
+
+def recall_hybrid(
+    index: ProfileIndex,
+    objective: str,
+    query_embedding: np.ndarray,
+    candidate_map: Dict[str, PersonProfile],
+    excluded: int,
+):
+    """
+    Dense and BM25 recall for one objective, merged with reciprocal-
+    rank fusion: score(c) = sum over lists of 1 / (RRF_K + rank).
+    Returns (ids, distances, fused scores) in fused order, every hit of
+    either list; see hybrid_scores(). In cosine mode the MIN_SCORE cut
+    applies to every fused hit, lexical ones included.
+    """
+
+    dense_ids, dense_distances = recall_objective(
+        index, query_embedding,
+        min(HYBRID_DENSE_K + excluded, len(candidate_map) + excluded),
+    )
+    dense = [
+        (cid, d) for cid, d in zip(dense_ids, dense_distances)
+        if cid in candidate_map
+    ][:HYBRID_DENSE_K]
+
+    lexical = [
+        cid for cid, _ in index.lexical.search(
+            objective, HYBRID_LEXICAL_K + excluded
+        )
+        if cid in candidate_map
+    ][:HYBRID_LEXICAL_K]
+
+    fused: Dict[str, float] = {}
+    for ranked in ([cid for cid, _ in dense], lexical):
+        for rank, cid in enumerate(ranked, start=1):
+            fused[cid] = fused.get(cid, 0.0) + 1.0 / (RRF_K + rank)
+
+    ids = sorted(fused, key=lambda cid: fused[cid], reverse=True)
+
+    distances = dict(dense)
+    distances.update(_distances_to(
+        index, [cid for cid in ids if cid not in distances], query_embedding
+    ))
+
+    # A profile removed between the two lookups has no vector left
+    ids = [cid for cid in ids if cid in distances]
+
+    # Lexical-only hits skipped recall_objective's MIN_SCORE cut
+    if SCORING_MODE == "cosine" and MIN_SCORE > 0:
+        max_distance = 1.0 - MIN_SCORE
+        ids = [cid for cid in ids if distances[cid] <= max_distance]
+
+    return ids, [distances[cid] for cid in ids], [fused[cid] for cid in ids]
+
+
+def hybrid_scores(
+    distances: List[float], fused: List[float]
+) -> List[float]:
+    """
+    Semantic scores for hybrid recall: the dense score blended with the
+    RRF score (HYBRID_FUSION_WEIGHT), so a strong exact-term match ranks
+    higher than its embedding distance alone would put it. The RRF part
+    is put on the dense part's scale: in cosine mode divided by its
+    maximum (first in both lists), in normalized mode by the sum over
+    this query's results.
+    """
+
+    if not fused:
+        return []
+
+    if SCORING_MODE == "cosine":
+        scale = 2.0 / (RRF_K + 1)
+    else:
+        scale = sum(fused)
+
+    return [
+        (1.0 - HYBRID_FUSION_WEIGHT) * dense
+        + HYBRID_FUSION_WEIGHT * (f / scale)
+        for dense, f in zip(semantic_scores(distances), fused)
+    ]
+
+
+def aggregate_scores(scores: List[float]) -> float:
+    """
+    Fuse one candidate's per-objective scores.
+
+    sum:     reward candidates relevant to many objectives
+    max:     best single objective wins
+    softmax: T * log(sum(exp(s / T))), a smooth max that still
+             gives a small bonus for additional strong objectives
+    """
+
+    if not scores:
+        return 0.0
+
+    if AGGREGATION == "max":
+        return max(scores)
+
+    if AGGREGATION == "softmax":
+        t = SOFTMAX_TEMPERATURE
+        peak = max(scores)
+        return peak + t * math.log(
+            sum(math.exp((s - peak) / t) for s in scores)
+        )
+
+    return sum(scores)
+
+# =========================================================
+# Complementary Scoring
+# =========================================================
+
+def complementary_scores(
+    index: ProfileIndex,
+    objectives: List[str],
+    candidate_map: Dict[str, PersonProfile],
+) -> List[Dict[str, float]]:
+    """
+    Per objective: candidate id -> best cosine similarity between one of
+    the objective's complementary offers and one of the candidate's own
+    objectives, at least COMPLEMENTARY_MIN_SIMILARITY. In normalized
+    SCORING_MODE each objective's scores are then divided by their sum,
+    the same scale as semantic_scores(). Offer embeddings are
+    precomputed in the objective graph and need lookups are cached, so
+    this issues no embedding calls once the user's objectives have been
+    seen (index workers pre-warm them).
+    """
+
+    per_objective: List[Dict[str, float]] = [{} for _ in objectives]
+
+    if not COMPLEMENTARY_ENABLED or not index.objectives:
+        return per_objective
+
+    offers = [
+        (obj_idx, vector)
+        for obj_idx, objective in enumerate(objectives)
+        for _, vector in complementary.expand(objective)
+    ]
+    if not offers:
+        return per_objective
+
+    total = sum(len(c) for c in index.objectives.values())
+    excluded = sum(
+        len(c) for pid, c in index.objectives.items()
+        if pid not in candidate_map
+    )
+    n_results = min(COMPLEMENTARY_RECALL_K + excluded, total)
+    if not n_results:
+        return per_objective
+
+    people, distances_per_offer = index.query_objectives(
+        np.vstack([vector for _, vector in offers]), n_results
+    )
+
+    for (obj_idx, _), pids, distances in zip(
+        offers, people, distances_per_offer
+    ):
+        scores = per_objective[obj_idx]
+        kept = 0
+        for pid, distance in zip(pids, distances):
+            if pid not in candidate_map:
+                continue
+            kept += 1
+            if kept > COMPLEMENTARY_RECALL_K:
+                break
+            similarity = 1.0 - distance
+            if similarity < COMPLEMENTARY_MIN_SIMILARITY:
+                continue
+            if similarity > scores.get(pid, 0.0):
+                scores[pid] = similarity
+
+    if SCORING_MODE != "cosine":
+        for scores in per_objective:
+            total_score = sum(scores.values())
+            for pid in scores:
+                scores[pid] /= total_score
+
+    return per_objective
+
 # =========================================================
 # Matchmaking Pipeline
 # =========================================================
 
+def objective_term(
+    objective: str,
+    candidate: PersonProfile,
+    semantic_score: float,
+    complementary_score: float = 0.0,
+):
+    """
+    One objective's contribution for one candidate.
+    Returns (role_score, final_score).
+    """
+
+    role_score = compute_role_alignment_score(objective, candidate)
+
+    final_score = (
+        SEMANTIC_WEIGHT * semantic_score
+        + ROLE_WEIGHT * role_score
+        + COMPLEMENTARY_WEIGHT * complementary_score
+    )
+
+    return role_score, final_score
+
+
+def _debug_row(
+    obj_idx: int,
+    objective: str,
+    candidate: PersonProfile,
+    rank,
+    distance,
+    semantic_score: float,
+    complementary_score: float,
+    role_score: float,
+    final_score: float,
+    cumulative_score,
+) -> dict:
+    row = {
+        "objective_index": obj_idx,
+        "objective": objective,
+        "candidate_id": candidate.id,
+        "candidate_name": candidate.name,
+        "rank": rank,
+        "distance": round(distance, 4) if distance != "" else "",
+        "semantic_score": round(semantic_score, 6),
+        "role_score": round(role_score, 6),
+        "final_score": round(final_score, 6),
+        "cumulative_score": (
+            round(cumulative_score, 6) if cumulative_score != "" else ""
+        ),
+    }
+    # Extra column only when the feature is on; those rows go to their
+    # own file so the existing debug CSV keeps its layout
+    if COMPLEMENTARY_ENABLED:
+        row["complementary_score"] = round(complementary_score, 6)
+    return row
+
+
+def _score_fixed(
+    index: ProfileIndex,
+    objectives: List[str],
+    query_embeddings: np.ndarray,
+    candidate_map: Dict[str, PersonProfile],
+    comp_scores: List[Dict[str, float]],
+    debug_rows: Optional[list],
+) -> Dict[str, List[float]]:
+    """
+    CHROMA_RECALL_K results per objective, scored independently.
+    Candidates reached only through complementary offers get a term
+    with a zero semantic score. In hybrid RETRIEVAL_MODE the results
+    come from recall_hybrid() and are scored by hybrid_scores().
+    """
+
+    objective_scores: Dict[str, List[float]] = {}
+
+    # The live index also holds people who are not candidates for this
+    # request (the user themself, at least); over-fetch so they do not
+    # eat into the recall depth.
+    excluded = len(index.documents.keys() - candidate_map.keys())
+    n_results = min(
+        CHROMA_RECALL_K + excluded, len(candidate_map) + excluded
+    )
+
+    for obj_idx, objective in enumerate(objectives):
+
+        if RETRIEVAL_MODE == "hybrid":
+            ids, distances, fused = recall_hybrid(
+                index, objective, query_embeddings[obj_idx],
+                candidate_map, excluded,
+            )
+            scores = hybrid_scores(distances, fused)
+        else:
+            ids, distances = recall_objective(
+                index, query_embeddings[obj_idx], n_results
+            )
+
+            hits = [
+                (cid, d) for cid, d in zip(ids, distances)
+                if cid in candidate_map
+            ][:CHROMA_RECALL_K]
+            ids = [cid for cid, _ in hits]
+            distances = [d for _, d in hits]
+            scores = semantic_scores(distances)
+
+        comp = comp_scores[obj_idx]
+        rows = list(zip(ids, distances, scores))
+        rows += [(cid, "", 0.0) for cid in comp if cid not in ids]
+
+        for rank, (cid, distance, semantic_score) in enumerate(rows, start=1):
+            candidate = candidate_map[cid]
+            comp_score = comp.get(cid, 0.0)
+
+            role_score, final_score = objective_term(
+                objective, candidate, semantic_score, comp_score
+            )
+
+            objective_scores.setdefault(cid, []).append(final_score)
+
+            if debug_rows is not None:
+                debug_rows.append(_debug_row(
+                    obj_idx, objective, candidate,
+                    rank if distance != "" else "",
+                    distance, semantic_score, comp_score,
+                    role_score, final_score,
+                    aggregate_scores(objective_scores[cid]),
+                ))
+
+    return objective_scores
+
+
+def _score_adaptive(
+    index: ProfileIndex,
+    objectives: List[str],
+    query_embeddings: np.ndarray,
+    candidate_map: Dict[str, PersonProfile],
+    comp_scores: List[Dict[str, float]],
+    debug_rows: Optional[list],
+) -> Dict[str, List[float]]:
+    """
+    Threshold-algorithm recall (Fagin et al.).
+
+    Each round does sorted access with depth K on every objective,
+    then random access (stored embeddings) to score every newly seen
+    candidate on ALL objectives exactly. The K-th similarity of each
+    list bounds what any unseen candidate can still score there, so
+    once the current top-k beats the aggregate of those bounds the
+    result equals exhaustive search. Otherwise K grows.
+
+    Candidates with complementary scores are random-accessed up front,
+    so unseen candidates never carry a complementary term.
+
+    Relies on every objective term being >= 0 and AGGREGATION being
+    monotone, which holds for clamped cosine scores and sum/max/softmax.
+    """
+
+    index_size = index.count()
+    if not index_size:
+        return {}
+
+    k = min(ADAPTIVE_INITIAL_K, index_size)
+
+    # cid -> {objective_index: final_score}
+    exact: Dict[str, Dict[int, float]] = {}
+    rounds = 0
+
+    new_ids = [
+        cid for comp in comp_scores for cid in comp
+        if cid in candidate_map
+    ]
+    new_ids = list(dict.fromkeys(new_ids))
+    for cid in new_ids:
+        exact[cid] = {}
+
+    while True:
+        rounds += 1
+        unseen_bounds = []
+
+        for obj_idx in range(len(objectives)):
+            ids, distances = recall_objective(
+                index, query_embeddings[obj_idx], k
+            )
+
+            for cid in ids:
+                if cid in candidate_map and cid not in exact:
+                    exact[cid] = {}
+                    new_ids.append(cid)
+
+            # A list shorter than K is exhausted (index end or MIN_SCORE
+            # cut): no unseen candidate can score on this objective.
+            if len(ids) == k and k < index_size:
+                tail = semantic_scores(distances[-1:])[0]
+                unseen_bounds.append(
+                    SEMANTIC_WEIGHT * tail + ROLE_WEIGHT * 1.0
+                )
+
+        if new_ids:
+            fetched_ids, vectors = index.fetch_embeddings(new_ids)
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            sims = (vectors / np.maximum(norms, 1e-12)) @ query_embeddings.T
+
+            for row, cid in enumerate(fetched_ids):
+                candidate = candidate_map[cid]
+                for obj_idx, objective in enumerate(objectives):
+                    similarity = float(sims[row, obj_idx])
+                    comp_score = comp_scores[obj_idx].get(cid, 0.0)
+
+                    if passes_min_score(similarity):
+                        semantic_score = max(0.0, similarity)
+                    elif comp_score > 0:
+                        semantic_score = 0.0
+                    else:
+                        continue
+
+                    role_score, final_score = objective_term(
+                        objective, candidate, semantic_score, comp_score
+                    )
+                    exact[cid][obj_idx] = final_score
+
+                    if debug_rows is not None:
+                        debug_rows.append(_debug_row(
+                            obj_idx, objective, candidate, "",
+                            1.0 - similarity, semantic_score, comp_score,
+                            role_score, final_score, "",
+                        ))
+
+            new_ids = []
+
+        if not unseen_bounds:
+            break
+
+        unseen_upper = aggregate_scores(unseen_bounds)
+        top = sorted(
+            (aggregate_scores(list(t.values())) for t in exact.values() if t),
+            reverse=True,
+        )
+
+        if len(top) >= RETURN_TOP_K and top[RETURN_TOP_K - 1] >= unseen_upper:
+            break
+
+        k = min(k * ADAPTIVE_GROWTH, index_size)
+
+    logger.info(
+        f"🎯 Adaptive recall settled at K={k} after {rounds} round(s), "
+        f"{len(exact)} candidates scored"
+    )
+
+    return {
+        cid: [terms[i] for i in sorted(terms)]
+        for cid, terms in exact.items()
+        if terms
+    }
+
+
 def rank_best_matches_per_objective(
     user: PersonProfile,
     candidates: List[PersonProfile],
     debug: bool = False,
+    index: Optional[ProfileIndex] = None,
 ):
     """
     Pipeline:
     1. Index candidates (skills/solutions only)
-    3. Normalize semantic score
-    2. Semantic recall per objective
+    2. Semantic recall per objective (pruned by MIN_SCORE in cosine mode;
+       fused with BM25 recall in hybrid RETRIEVAL_MODE)
+    3. Semantic score (SCORING_MODE)
     4. Add role-based preference boost
-    5. Aggregate across objectives
+    5. Add complementary-offer matches (reciprocal stage)
+    6. Aggregate across objectives (AGGREGATION)
+
+    RECALL_MODE decides how deep step 2 goes. `index` selects the
+    index to search (an event shard); default is the global one.
     """
 
-    ensure_indexed(candidates)
+    index = index or default_index
+    index.ensure_indexed(candidates)
 
     candidate_map: Dict[str, PersonProfile] = {
         c.id: c for c in candidates
     }
 
-    aggregated_scores: Dict[str, float] = {}
-    debug_rows = []
+    debug_rows = [] if debug else None
 
     objectives = user.objectives or []
     if not objectives:
         return []
 
-    for obj_idx, objective in enumerate(objectives):
+    query_embeddings = embed_queries(
+        [objective_query(o) for o in objectives]
+    )
 
-        query = (
-            "I want someone who can help me achieve "
-            f"the following objective: {objective}"
-        )
+    comp_scores = complementary_scores(index, objectives, candidate_map)
 
-        results = collection.query(
-            query_texts=[query],
-            n_results=min(CHROMA_RECALL_K, len(candidates)),
-            include=["distances"],
+    if RECALL_MODE == "adaptive" and SCORING_MODE == "cosine":
+        objective_scores = _score_adaptive(
+            index, objectives, query_embeddings, candidate_map,
+            comp_scores, debug_rows,
         )
-
-        ids = results["ids"][0]
-        distances = results["distances"][0]
-
-        raw_semantic_scores = [1 / (1 + d) for d in distances]
-        total_raw = sum(raw_semantic_scores) or 1.0
-
-        for rank, (cid, distance, raw) in enumerate(
-            zip(ids, distances, raw_semantic_scores), start=1
-        ):
-            candidate = candidate_map.get(cid)
-            if not candidate:
-                continue
-
-            semantic_score = raw / total_raw
-            role_score = compute_role_alignment_score(
-                objective, candidate
+    else:
+        if RECALL_MODE == "adaptive":
+            logger.warning(
+                "Adaptive recall needs SCORING_MODE='cosine'; "
+                "falling back to fixed CHROMA_RECALL_K"
             )
-
-            final_score = (
-                SEMANTIC_WEIGHT * semantic_score
-                + ROLE_WEIGHT * role_score
-            )
-
-            aggregated_scores[cid] = (
-                aggregated_scores.get(cid, 0.0)
-                + final_score
-            )
-
-            if debug:
-                debug_rows.append({
-                    "objective_index": obj_idx,
-                    "objective": objective,
-                    "candidate_id": cid,
-                    "candidate_name": candidate.name,
-                    "rank": rank,
-                    "distance": round(distance, 4),
-                    "semantic_score": round(semantic_score, 6),
-                    "role_score": round(role_score, 6),
-                    "final_score": round(final_score, 6),
-                    "cumulative_score": round(
-                        aggregated_scores[cid], 6
-                    ),
-                })
+        objective_scores = _score_fixed(
+            index, objectives, query_embeddings, candidate_map,
+            comp_scores, debug_rows,
+        )
 
     # =====================================================
     # Debug CSV
     # =====================================================
 
     if debug and debug_rows:
-        file_exists = os.path.exists(DEBUG_CSV)
+        debug_csv = (
+            DEBUG_CSV_COMPLEMENTARY if COMPLEMENTARY_ENABLED else DEBUG_CSV
+        )
+        file_exists = os.path.exists(debug_csv)
         fieldnames = list(debug_rows[0].keys())
 
-        with open(DEBUG_CSV, "a", newline="", encoding="utf-8") as f:
+        with open(debug_csv, "a", newline="", encoding="utf-8") as f:
             writer = csv.DictWriter(f, fieldnames=fieldnames)
             if not file_exists:
                 writer.writeheader()
             writer.writerows(debug_rows)
 
-        logger.info(f"📊 Debug CSV updated: {DEBUG_CSV}")
+        logger.info(f"📊 Debug CSV updated: {debug_csv}")
 
     # =====================================================
     # Final Ranking
     # =====================================================
 
+    aggregated_scores = {
+        cid: aggregate_scores(scores)
+        for cid, scores in objective_scores.items()
+    }
+
     ranked = sorted(
         aggregated_scores.items(),
         key=lambda x: x[1],
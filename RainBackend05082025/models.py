@@ -9,6 +9,7 @@ class PersonProfile(BaseModel):
 
     skills: List[str] = Field(default_factory=list)
     solutions: List[str] = Field(default_factory=list)
+    applied_in: List[str] = Field(default_factory=list)  # where skills were used
     objectives: List[str] = Field(default_factory=list)
 
     # 🔑 ROLE / TITLE FIELDS
@@ -0,0 +1,218 @@
+import argparse
+import bisect
+import csv
+import heapq
+import logging
+import os
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from models import PersonProfile
+
+# =========================================================
+# Logging
+# =========================================================
+
+logger = logging.getLogger(__name__)
+
+# =========================================================
+# Configuration (TUNABLE)
+# =========================================================
+
+BASE_DIR = os.path.dirname(__file__)
+EXPORT_DIR = os.path.join(BASE_DIR, "exports")
+
+# Tags shared by more than this many people are skipped: they make
+# every pair "overlap" and blow the output up towards N^2
+MAX_POSTING_SIZE = 200
+
+CSV_FIELDS = ["person_1", "person_2", "shared_interests", "shared_objectives"]
+
+# =========================================================
+# Inverted index
+# =========================================================
+
+class TagIndex:
+    """
+    tag -> sorted list of person positions, plus each person's tags.
+    Tags are matched case-insensitively; the first spelling seen is
+    kept for display.
+    """
+
+    def __init__(self, tags_per_person: List[List[str]], max_posting: int):
+        postings: Dict[str, List[int]] = defaultdict(list)
+        self.display: Dict[str, str] = {}
+        self.tags_of: List[List[str]] = []
+
+        for pos, tags in enumerate(tags_per_person):
+            keys = []
+            for tag in tags:
+                key = tag.strip().lower()
+                if not key or key in keys:
+                    continue
+                keys.append(key)
+                self.display.setdefault(key, tag.strip())
+                postings[key].append(pos)
+            self.tags_of.append(keys)
+
+        self.capped = {
+            k for k, people in postings.items() if len(people) > max_posting
+        }
+        self.postings = {
+            k: people for k, people in postings.items()
+            if k not in self.capped
+        }
+
+        if self.capped:
+            logger.info(
+                f"✂️ Skipping {len(self.capped)} tags shared by more than "
+                f"{max_posting} people"
+            )
+
+    def shared_with(self, pos: int, after_only: bool) -> Dict[int, List[str]]:
+        """
+        Other people sharing at least one (uncapped) tag with `pos`,
+        with the shared tags. after_only restricts to positions > pos.
+        """
+
+        shared: Dict[int, List[str]] = defaultdict(list)
+        for key in self.tags_of[pos]:
+            people = self.postings.get(key)
+            if not people:
+                continue
+            start = bisect.bisect_right(people, pos) if after_only else 0
+            for other in people[start:]:
+                if other != pos:
+                    shared[other].append(self.display[key])
+        return shared
+
+# =========================================================
+# Tag extraction
+# =========================================================
+
+def interest_tags(p: PersonProfile) -> List[str]:
+    interests = getattr(p, "interests", None) or []
+    return [t for t in list(interests) + list(p.skills or []) if isinstance(t, str)]
+
+
+def objective_tags(p: PersonProfile) -> List[str]:
+    return [
+        clause.strip()
+        for o in p.objectives or []
+        for clause in o.split(";")
+        if clause.strip()
+    ]
+
+# =========================================================
+# Pair generation
+# =========================================================
+
+def generate_pairs(
+    profiles: List[PersonProfile],
+    top_k: Optional[int] = None,
+    max_posting: int = MAX_POSTING_SIZE,
+) -> Iterator[Tuple[int, int, List[str], List[str]]]:
+    """
+    Yield (i, j, shared_interests, shared_objectives) for every pair
+    sharing a tag. Work is proportional to the postings actually
+    shared, not to N^2.
+
+    With top_k, each person keeps only their top_k partners (most shared
+    tags first); a pair is emitted once even if both sides keep it.
+    """
+
+    interests = TagIndex([interest_tags(p) for p in profiles], max_posting)
+    objectives = TagIndex([objective_tags(p) for p in profiles], max_posting)
+
+    kept: Dict[int, set] = {}
+
+    for i in range(len(profiles)):
+        after_only = top_k is None
+        by_interest = interests.shared_with(i, after_only)
+        by_objective = objectives.shared_with(i, after_only)
+        partners = by_interest.keys() | by_objective.keys()
+
+        if top_k is not None:
+            partners = heapq.nlargest(
+                top_k,
+                partners,
+                key=lambda j: (
+                    len(by_interest.get(j, ())) + len(by_objective.get(j, ())),
+                    -j,
+                ),
+            )
+            kept[i] = set(partners)
+
+        for j in sorted(partners):
+            if top_k is not None and j < i and i in kept.get(j, ()):
+                continue  # already emitted from j's side
+            yield i, j, by_interest.get(j, []), by_objective.get(j, [])
+
+
+def export_pairs(
+    profiles: List[PersonProfile],
+    output_path: str,
+    top_k: Optional[int] = None,
+    max_posting: int = MAX_POSTING_SIZE,
+) -> int:
+    """
+    Stream shared-interest pairs to CSV. Returns the number of rows.
+    """
+
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    started = time.perf_counter()
+    rows = 0
+
+    with open(output_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_FIELDS)
+
+        for i, j, shared_interests, shared_objectives in generate_pairs(
+            profiles, top_k, max_posting
+        ):
+            writer.writerow([
+                profiles[i].name or profiles[i].id,
+                profiles[j].name or profiles[j].id,
+                ", ".join(shared_interests),
+                ", ".join(shared_objectives),
+            ])
+            rows += 1
+
+    logger.info(
+        f"📤 Exported {rows} pairs for {len(profiles)} people to "
+        f"{output_path} in {time.perf_counter() - started:.2f}s"
+    )
+    return rows
+
+# =========================================================
+# CLI
+# =========================================================
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(
+        description="Export pairs with shared interests/objectives"
+    )
+    parser.add_argument(
+        "--event", help="read data/<event>_profiles.json instead of the store"
+    )
+    parser.add_argument("--top-k", type=int, default=None)
+    parser.add_argument("--max-posting", type=int, default=MAX_POSTING_SIZE)
+    parser.add_argument("--out", default=None)
+    args = parser.parse_args()
+
+    if args.event:
+        from event_data import load_event_profiles
+        people = load_event_profiles(args.event)
+    else:
+        import profile_store
+        people = profile_store.list_persons()
+
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    prefix = args.event or "startup"
+    out = args.out or os.path.join(EXPORT_DIR, f"{prefix}_{stamp}_matches.csv")
+
+    export_pairs(people, out, args.top_k, args.max_posting)
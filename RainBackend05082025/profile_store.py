@@ -0,0 +1,370 @@
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+from models import PersonProfile
+
+# =========================================================
+# Logging
+# =========================================================
+
+logger = logging.getLogger(__name__)
+
+# =========================================================
+# Paths
+# =========================================================
+
+if getattr(sys, "frozen", False):
+    BASE_DIR = os.path.dirname(sys.executable)
+else:
+    BASE_DIR = os.path.dirname(__file__)
+
+DATA_DIR = os.path.join(BASE_DIR, "data")
+DB_PATH = os.path.join(DATA_DIR, "profiles.sqlite3")
+
+# Seed files (used once, when the store is empty)
+PROFILES_SEED = "people_profiles_updated.json"
+OBJECTIVES_SEED = "userProfileNetworkingObjectives_updated.json"
+
+# =========================================================
+# Connection
+# =========================================================
+
+_lock = threading.RLock()
+_conn: Optional[sqlite3.Connection] = None
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS profiles (
+    id         TEXT PRIMARY KEY,
+    name       TEXT,
+    data       TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS profiles_name ON profiles(name);
+CREATE TABLE IF NOT EXISTS objectives (
+    user_id    TEXT PRIMARY KEY,
+    objectives TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+
+def _connection() -> sqlite3.Connection:
+    global _conn
+
+    with _lock:
+        if _conn is None:
+            os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
+            _conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+            _conn.execute("PRAGMA journal_mode=WAL")
+            _conn.execute("PRAGMA synchronous=NORMAL")
+            _conn.executescript(_SCHEMA)
+            _seed_if_empty(_conn)
+        return _conn
+
+
+def _load_seed(filename: str):
+    path = os.path.join(DATA_DIR, filename)
+    if not os.path.exists(path):
+        logger.warning(f"Missing seed file: {path}")
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _seed_if_empty(conn: sqlite3.Connection) -> None:
+    if conn.execute("SELECT 1 FROM profiles LIMIT 1").fetchone():
+        return
+
+    people = _load_seed(PROFILES_SEED)
+    objectives = _load_seed(OBJECTIVES_SEED)
+    now = time.time()
+
+    with conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO profiles VALUES (?, ?, ?, ?)",
+            [
+                (p["id"], p.get("name"), json.dumps(p), now)
+                for p in people
+            ],
+        )
+        conn.executemany(
+            "INSERT OR REPLACE INTO objectives VALUES (?, ?, ?)",
+            [
+                (o["user_id"], json.dumps(o.get("objectives", [])), now)
+                for o in objectives
+            ],
+        )
+
+    logger.info(
+        f"🌱 Seeded profile store with {len(people)} profiles, "
+        f"{len(objectives)} objective sets"
+    )
+
+def data_version() -> int:
+    """
+    Changes whenever another connection (e.g. another server process)
+    commits to the store; used by the shared index builder to poll.
+    """
+    with _lock:
+        return _connection().execute("PRAGMA data_version").fetchone()[0]
+
+# =========================================================
+# Profiles
+# =========================================================
+
+def get_profile(person_id: str) -> Optional[Dict[str, Any]]:
+    with _lock:
+        row = _connection().execute(
+            "SELECT data FROM profiles WHERE id = ?", (person_id,)
+        ).fetchone()
+    return json.loads(row[0]) if row else None
+
+
+def find_profile_id_by_name(name: str) -> Optional[str]:
+    with _lock:
+        row = _connection().execute(
+            "SELECT id FROM profiles WHERE name = ? LIMIT 1", (name,)
+        ).fetchone()
+    return row[0] if row else None
+
+
+def existing_ids(person_ids: List[str]) -> set:
+    """
+    The subset of person_ids already in the store (one query).
+    """
+    if not person_ids:
+        return set()
+    with _lock:
+        rows = _connection().execute(
+            "SELECT id FROM profiles WHERE id IN "
+            f"({','.join('?' * len(person_ids))})",
+            list(person_ids),
+        ).fetchall()
+    return {r[0] for r in rows}
+
+
+def list_profiles() -> List[Dict[str, Any]]:
+    with _lock:
+        rows = _connection().execute(
+            "SELECT data FROM profiles ORDER BY rowid"
+        ).fetchall()
+    return [json.loads(r[0]) for r in rows]
+
+
+def all_ids() -> set:
+    with _lock:
+        rows = _connection().execute("SELECT id FROM profiles").fetchall()
+    return {r[0] for r in rows}
+
+
+def changed_ids(since: float) -> List[str]:
+    """
+    Ids whose profile or objectives were written after `since`
+    (a time.time() value).
+    """
+    with _lock:
+        rows = _connection().execute(
+            "SELECT id FROM profiles WHERE updated_at > ? "
+            "UNION SELECT user_id FROM objectives WHERE updated_at > ?",
+            (since, since),
+        ).fetchall()
+    return [r[0] for r in rows]
+
+
+def upsert_profiles(profiles: Iterable[Dict[str, Any]]) -> int:
+    """
+    Insert or replace raw profiles (people_profiles schema) in one
+    transaction. Returns the number of rows written.
+    """
+
+    now = time.time()
+    rows = [(p["id"], p.get("name"), json.dumps(p), now) for p in profiles]
+
+    with _lock:
+        conn = _connection()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO profiles VALUES (?, ?, ?, ?)", rows
+            )
+    return len(rows)
+
+
+def upsert_profile(profile: Dict[str, Any]) -> None:
+    upsert_profiles([profile])
+
+
+def patch_profile(
+    person_id: str, changes: Dict[str, Any]
+) -> Optional[Dict[str, Any]]:
+    """
+    Shallow-merge changes into an existing profile.
+    Returns the merged profile, or None if it does not exist.
+    """
+
+    with _lock:
+        current = get_profile(person_id)
+        if current is None:
+            return None
+
+        current.update(changes)
+        current["id"] = person_id
+        upsert_profile(current)
+    return current
+
+
+def delete_profile(person_id: str) -> bool:
+    with _lock:
+        conn = _connection()
+        with conn:
+            cur = conn.execute(
+                "DELETE FROM profiles WHERE id = ?", (person_id,)
+            )
+            conn.execute(
+                "DELETE FROM objectives WHERE user_id = ?", (person_id,)
+            )
+    return cur.rowcount > 0
+
+# =========================================================
+# Objectives
+# =========================================================
+
+def get_objectives(user_id: str) -> List[str]:
+    with _lock:
+        row = _connection().execute(
+            "SELECT objectives FROM objectives WHERE user_id = ?",
+            (user_id,),
+        ).fetchone()
+    return json.loads(row[0]) if row else []
+
+
+def all_objectives() -> Dict[str, List[str]]:
+    with _lock:
+        rows = _connection().execute(
+            "SELECT user_id, objectives FROM objectives"
+        ).fetchall()
+    return {user_id: json.loads(objs) for user_id, objs in rows}
+
+
+def set_objectives_many(items: Iterable[tuple]) -> int:
+    """
+    items: (user_id, [objective, ...]) pairs, written in one transaction.
+    """
+
+    now = time.time()
+    rows = [(uid, json.dumps(list(objs)), now) for uid, objs in items]
+
+    with _lock:
+        conn = _connection()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO objectives VALUES (?, ?, ?)", rows
+            )
+    return len(rows)
+
+
+def set_objectives(user_id: str, objectives: List[str]) -> None:
+    set_objectives_many([(user_id, objectives)])
+
+
+def delete_objectives(user_id: str) -> bool:
+    with _lock:
+        conn = _connection()
+        with conn:
+            cur = conn.execute(
+                "DELETE FROM objectives WHERE user_id = ?", (user_id,)
+            )
+    return cur.rowcount > 0
+
+# =========================================================
+# FIELD MAPPERS (raw profile -> PersonProfile)
+# =========================================================
+
+def extract_skills(p: dict) -> List[str]:
+    """
+    top_skills -> ["Capital markets technology", ...]
+    """
+    return [
+        s.get("skill")
+        for s in p.get("top_skills", [])
+        if isinstance(s, dict) and s.get("skill")
+    ]
+
+
+def extract_applied_in(p: dict) -> List[str]:
+    """
+    top_skills -> ["Building and integrating market-facing systems; ...", ...]
+    """
+    return [
+        s.get("applied_in")
+        for s in p.get("top_skills", [])
+        if isinstance(s, dict) and s.get("applied_in")
+    ]
+
+
+def extract_solutions(p: dict) -> List[str]:
+    """
+    solutions_offered -> list[str]
+    """
+    return [
+        s for s in p.get("solutions_offered", [])
+        if isinstance(s, str)
+    ]
+
+
+def extract_bio(p: dict) -> str:
+    """
+    Build a semantic bio from current_role
+    """
+    role = p.get("current_role", {}) or {}
+    title = role.get("title", "")
+    company = role.get("company", "")
+    location = role.get("location", "")
+
+    parts = [title, company, location]
+    return " | ".join([x for x in parts if x])
+
+
+def extract_role(p: dict) -> str:
+    """
+    Normalize role using ROLE_TAXONOMY
+    """
+    role = p.get("current_role", {}) or {}
+    title = role.get("title", "")
+    return title
+
+
+def to_person_profile(p: dict, objectives: List[str]) -> PersonProfile:
+    return PersonProfile(
+        id=p["id"],
+        name=p["name"],
+        role=extract_role(p),
+        bio=extract_bio(p),
+        skills=extract_skills(p),
+        solutions=extract_solutions(p),
+        applied_in=extract_applied_in(p),
+        objectives=objectives,
+    )
+
+
+def load_person(person_id: str) -> Optional[PersonProfile]:
+    raw = get_profile(person_id)
+    if raw is None:
+        return None
+    return to_person_profile(raw, get_objectives(person_id))
+
+
+def list_persons() -> List[PersonProfile]:
+    """
+    Every stored profile with its objectives (two queries).
+    """
+    objectives = all_objectives()
+    return [
+        to_person_profile(p, objectives.get(p["id"], []))
+        for p in list_profiles()
+    ]
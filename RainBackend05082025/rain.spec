@@ -25,6 +25,13 @@ hiddenimports += collect_submodules("langchain")
 hiddenimports += collect_submodules("faiss")
 hiddenimports += collect_submodules("sklearn")
 hiddenimports += collect_submodules("numpy")
+hiddenimports += collect_submodules("chromadb")
+
+# Local modules imported lazily by main.py's warm-up task
+hiddenimports += [
+    "embeddings", "complementary", "matchmaking",
+    "recommendations", "index_workers", "shards", "shared_index",
+]
 
 # Include data folder contents
 datas = []
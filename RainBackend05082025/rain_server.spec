@@ -6,7 +6,7 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[('data', 'data'), ('prompt_templates.py', '.')],
-    hiddenimports=['fastapi', 'starlette', 'pydantic', 'jinja2', 'uvicorn', 'uvloop', 'httptools', 'celery', 'redis', 'psycopg2', 'tinydb', 'langchain', 'faiss', 'sklearn', 'numpy'],
+    hiddenimports=['fastapi', 'starlette', 'pydantic', 'jinja2', 'uvicorn', 'uvloop', 'httptools', 'celery', 'redis', 'psycopg2', 'tinydb', 'langchain', 'faiss', 'sklearn', 'numpy', 'chromadb', 'embeddings', 'complementary', 'matchmaking', 'recommendations', 'index_workers', 'shards', 'shared_index'],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
@@ -0,0 +1,265 @@
+import json
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict, defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+import embeddings
+from models import PersonProfile
+
+# =========================================================
+# Logging
+# =========================================================
+
+logger = logging.getLogger(__name__)
+
+# =========================================================
+# Configuration (TUNABLE)
+# =========================================================
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+NEWS_FILE = os.path.join(DATA_DIR, "news_items.json")
+NETWORKS_FILE = os.path.join(DATA_DIR, "network_details.json")
+
+TOP_NEWS = 3
+TOP_NETWORKS = 3
+
+# score = EMBEDDING_WEIGHT * cosine + TAG_WEIGHT * share of item tags
+# that appear in the user's skills/objectives
+EMBEDDING_WEIGHT = 0.6
+TAG_WEIGHT = 0.4
+
+USER_CACHE_SIZE = 4096
+
+# =========================================================
+# Catalog (precomputed in batch)
+# =========================================================
+
+def _singular(tag: str) -> str:
+    # One trailing "s" only: "business" must stay "business"
+    return tag[:-1] if tag.endswith("s") else tag
+
+
+class Catalog:
+    """
+    One item family (news or networks): embeddings of title + text,
+    tag -> rows inverted index, and a regex that finds the catalog's
+    tags in free text.
+    """
+
+    def __init__(self, items: List[dict], text_key: str, tags_of):
+        self.items = items
+        self.postings: Dict[str, np.ndarray] = {}
+        self.tag_counts = np.zeros(len(items), dtype=np.float32)
+
+        postings = defaultdict(list)
+        for row, item in enumerate(items):
+            tags = {t.lower() for t in tags_of(item) if t}
+            self.tag_counts[row] = len(tags)
+            for tag in tags:
+                postings[tag].append(row)
+        self.postings = {
+            t: np.asarray(rows, dtype=np.int64) for t, rows in postings.items()
+        }
+
+        # "Startups" should also match "startup"
+        alternatives = sorted(
+            (re.escape(_singular(t)) + "s?" for t in self.postings),
+            key=len, reverse=True,
+        )
+        self.tag_pattern = (
+            re.compile(r"\b(" + "|".join(alternatives) + r")\b", re.I)
+            if alternatives else None
+        )
+        self._tag_for = {_singular(t): t for t in self.postings}
+
+        texts = [
+            f"{item.get('title', '')}. {item.get(text_key, '')}"
+            for item in items
+        ]
+        self.vectors = (
+            embeddings.get_provider().embed(texts) if texts
+            else np.zeros((0, 0), dtype=np.float32)
+        )
+
+    def tags_in(self, text: str) -> List[str]:
+        if self.tag_pattern is None:
+            return []
+        found = {
+            self._tag_for[_singular(m.lower())]
+            for m in self.tag_pattern.findall(text)
+        }
+        return sorted(found)
+
+    def score(self, similarities: np.ndarray, user_text: str) -> np.ndarray:
+        """
+        Vectorized over all items: `similarities` is the user's row of
+        the user x item cosine matrix; tags add a posting-list scatter.
+        """
+
+        if not self.items:
+            return np.zeros(0, dtype=np.float32)
+
+        tag_hits = np.zeros(len(self.items), dtype=np.float32)
+        for tag in self.tags_in(user_text):
+            np.add.at(tag_hits, self.postings[tag], 1.0)
+        tag_share = tag_hits / np.maximum(self.tag_counts, 1.0)
+
+        return EMBEDDING_WEIGHT * similarities + TAG_WEIGHT * tag_share
+
+    def top(self, scores: np.ndarray, n: int) -> List[dict]:
+        """
+        Best n items; items with no positive score are not recommended.
+        """
+        order = [i for i in np.argsort(-scores)[:n] if scores[i] > 0]
+        return [
+            {
+                "id": self.items[i]["id"],
+                "title": self.items[i].get("title"),
+                "score": round(float(scores[i]), 6),
+            }
+            for i in order
+        ]
+
+
+def _load(path: str) -> List[dict]:
+    if not os.path.exists(path):
+        logger.warning(f"Missing data file: {path}")
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _files_version() -> Tuple:
+    return tuple(
+        os.stat(p).st_mtime_ns if os.path.exists(p) else 0
+        for p in (NEWS_FILE, NETWORKS_FILE)
+    )
+
+
+_lock = threading.RLock()
+_catalogs: Optional[Tuple[Catalog, Catalog]] = None
+_catalog_version: Optional[Tuple] = None
+
+# user id -> (profile fingerprint, catalog version, recommendations)
+_user_cache: "OrderedDict[str, tuple]" = OrderedDict()
+
+
+def load_catalogs() -> Tuple[Catalog, Catalog]:
+    """
+    (news, networks), rebuilt only when the data files change.
+    """
+    global _catalogs, _catalog_version
+
+    version = _files_version()
+    with _lock:
+        if _catalogs is None or version != _catalog_version:
+            news = Catalog(
+                _load(NEWS_FILE), "summary", lambda i: i.get("tags", [])
+            )
+            networks = Catalog(
+                _load(NETWORKS_FILE), "description",
+                lambda i: [i.get("topic")],
+            )
+            _catalogs, _catalog_version = (news, networks), version
+            logger.info(
+                f"📰 Recommendation catalogs: {len(news.items)} news, "
+                f"{len(networks.items)} networks"
+            )
+        return _catalogs
+
+# =========================================================
+# Per-user recommendations
+# =========================================================
+
+def _user_text(user: PersonProfile) -> str:
+    return " ; ".join(
+        list(user.skills or [])
+        + list(user.solutions or [])
+        + list(user.objectives or [])
+    )
+
+
+def _rank(
+    news: Catalog, networks: Catalog, vector: np.ndarray, text: str
+) -> dict:
+    result = {"news": [], "networks": []}
+    if news.items:
+        result["news"] = news.top(
+            news.score(news.vectors @ vector, text), TOP_NEWS
+        )
+    if networks.items:
+        result["networks"] = networks.top(
+            networks.score(networks.vectors @ vector, text), TOP_NETWORKS
+        )
+    return result
+
+
+def recommend(user: PersonProfile) -> dict:
+    """
+    Top news items and networks for a user. Cached per user and
+    recomputed only when the profile text or the catalogs change.
+    """
+
+    news, networks = load_catalogs()
+    text = _user_text(user)
+
+    with _lock:
+        cached = _user_cache.get(user.id)
+        if cached and cached[0] == text and cached[1] == _catalog_version:
+            _user_cache.move_to_end(user.id)
+            return cached[2]
+        version = _catalog_version
+
+    result = {"news": [], "networks": []}
+    if text:
+        vector = embeddings.get_provider().embed([text])[0]
+        result = _rank(news, networks, vector, text)
+
+    with _lock:
+        _user_cache[user.id] = (text, version, result)
+        _user_cache.move_to_end(user.id)
+        while len(_user_cache) > USER_CACHE_SIZE:
+            _user_cache.popitem(last=False)
+
+    return result
+
+
+def precompute(users: List[PersonProfile]) -> None:
+    """
+    Batch warm-up: embeds all users in one call and fills the cache.
+    Called by the index workers whenever profiles change.
+    """
+
+    news, networks = load_catalogs()
+    users = [u for u in users if _user_text(u)]
+    if not users:
+        return
+
+    texts = [_user_text(u) for u in users]
+    vectors = embeddings.get_provider().embed(texts)
+
+    with _lock:
+        version = _catalog_version
+
+    results = [
+        (user.id, text, _rank(news, networks, vectors[row], text))
+        for row, (user, text) in enumerate(zip(users, texts))
+    ]
+
+    with _lock:
+        for user_id, text, result in results:
+            _user_cache[user_id] = (text, version, result)
+            _user_cache.move_to_end(user_id)
+        while len(_user_cache) > USER_CACHE_SIZE:
+            _user_cache.popitem(last=False)
+
+
+def forget(user_ids: List[str]) -> None:
+    with _lock:
+        for user_id in user_ids:
+            _user_cache.pop(user_id, None)
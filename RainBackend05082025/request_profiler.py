@@ -0,0 +1,282 @@
+import hmac
+import json
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+# =========================================================
+# Logging
+# =========================================================
+
+logger = logging.getLogger(__name__)
+
+# =========================================================
+# Configuration (TUNABLE, overridable per deployment via env)
+# =========================================================
+
+# Admin endpoints and on-demand capture are disabled unless set
+ADMIN_TOKEN = os.getenv("RAIN_ADMIN_TOKEN", "")
+
+# Fraction of requests captured without asking (0 = only on demand)
+SAMPLE_RATE = float(os.getenv("RAIN_PROFILE_SAMPLE_RATE", "0"))
+
+PROFILE_DIR = os.getenv(
+    "RAIN_PROFILE_DIR",
+    os.path.join(os.path.dirname(__file__), "data", "request_profiles"),
+)
+MAX_CAPTURES = 50              # ring: oldest captures are deleted
+SAMPLE_INTERVAL_SECONDS = 0.001
+
+ADMIN_HEADER = "x-admin-token"
+PROFILE_HEADER = "x-profile"
+PROFILE_QUERY = "profile"
+
+# =========================================================
+# Switch
+# =========================================================
+
+def is_admin(headers) -> bool:
+    token = headers.get(ADMIN_HEADER, "")
+    return bool(ADMIN_TOKEN) and hmac.compare_digest(token, ADMIN_TOKEN)
+
+
+def should_capture(headers, query_params) -> bool:
+    """
+    Capture this request? On demand (admin token plus the header or
+    query flag) or by sampling. Nothing is set up when this is False.
+    """
+    if SAMPLE_RATE > 0 and random.random() < SAMPLE_RATE:
+        return True
+    asked = (
+        headers.get(PROFILE_HEADER) == "1"
+        or query_params.get(PROFILE_QUERY) == "1"
+    )
+    return asked and is_admin(headers)
+
+# =========================================================
+# Sampler
+# =========================================================
+
+Frame = Tuple[str, str, int]   # (function, file, first line)
+
+
+class ThreadSampler:
+    """
+    Samples one thread's Python stack every `interval` seconds from a
+    helper thread (statistical, no tracing hooks), so the profiled code
+    runs at full speed apart from brief GIL hand-offs.
+    """
+
+    def __init__(
+        self, thread_id: int, interval: float = SAMPLE_INTERVAL_SECONDS
+    ):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()   # root-first tuple of Frame
+        self.started = 0.0
+        self.elapsed = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _sample(self) -> None:
+        frame = sys._current_frames().get(self.thread_id)
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(
+                (code.co_name, code.co_filename, code.co_firstlineno)
+            )
+            frame = frame.f_back
+        if stack:
+            self.stacks[tuple(reversed(stack))] += 1
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self) -> None:
+        self.started = time.perf_counter()
+        self._thread = threading.Thread(
+            target=self._run, name="request-profiler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.elapsed = time.perf_counter() - self.started
+
+# =========================================================
+# Output formats
+# =========================================================
+
+def _label(frame: Frame) -> str:
+    name, filename, line = frame
+    return f"{name} ({os.path.basename(filename)}:{line})"
+
+
+def to_collapsed(stacks: Counter) -> str:
+    """
+    Brendan Gregg's folded format: "root;child;leaf count" per line
+    (flamegraph.pl, speedscope, inferno all read it).
+    """
+    return "".join(
+        ";".join(_label(f) for f in stack) + f" {count}\n"
+        for stack, count in stacks.most_common()
+    )
+
+
+def to_speedscope(stacks: Counter, name: str, interval: float) -> dict:
+    frames: List[dict] = []
+    index: Dict[Frame, int] = {}
+    samples, weights = [], []
+
+    for stack, count in stacks.items():
+        row = []
+        for frame in stack:
+            if frame not in index:
+                index[frame] = len(frames)
+                frames.append({
+                    "name": frame[0], "file": frame[1], "line": frame[2],
+                })
+            row.append(index[frame])
+        samples.append(row)
+        weights.append(count * interval)
+
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "shared": {"frames": frames},
+        "profiles": [{
+            "type": "sampled",
+            "name": name,
+            "unit": "seconds",
+            "startValue": 0,
+            "endValue": sum(weights),
+            "samples": samples,
+            "weights": weights,
+        }],
+        "name": name,
+        "exporter": "rain-request-profiler",
+    }
+
+# =========================================================
+# Ring directory
+# =========================================================
+
+_ring_lock = threading.Lock()
+_safe_name = re.compile(r"^[A-Za-z0-9_.-]+$")
+
+
+def _save(label: str, sampler: ThreadSampler) -> str:
+    # Ids sort by capture time, which is the order the ring evicts in
+    now = time.time()
+    stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(now))
+    stamp += f".{int(now * 1000) % 1000:03d}"
+    capture_id = f"{stamp}-{int(sampler.elapsed * 1000)}ms-{label}"
+    capture_id = re.sub(r"[^A-Za-z0-9_.-]", "_", capture_id)
+
+    with _ring_lock:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        with open(
+            os.path.join(PROFILE_DIR, f"{capture_id}.folded"),
+            "w", encoding="utf-8",
+        ) as f:
+            f.write(to_collapsed(sampler.stacks))
+        with open(
+            os.path.join(PROFILE_DIR, f"{capture_id}.speedscope.json"),
+            "w", encoding="utf-8",
+        ) as f:
+            json.dump(
+                to_speedscope(sampler.stacks, capture_id, sampler.interval), f
+            )
+        _prune_locked()
+
+    return capture_id
+
+
+def _capture_ids() -> List[str]:
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    return sorted(
+        name[:-len(".folded")]
+        for name in os.listdir(PROFILE_DIR)
+        if name.endswith(".folded")
+    )
+
+
+def _prune_locked() -> None:
+    captures = _capture_ids()
+    for capture_id in captures[:max(0, len(captures) - MAX_CAPTURES)]:
+        for suffix in (".folded", ".speedscope.json"):
+            try:
+                os.remove(os.path.join(PROFILE_DIR, capture_id + suffix))
+            except FileNotFoundError:
+                pass
+
+
+def list_captures() -> List[dict]:
+    captures = []
+    for capture_id in reversed(_capture_ids()):
+        path = os.path.join(PROFILE_DIR, f"{capture_id}.folded")
+        try:
+            size = os.path.getsize(path)
+        except FileNotFoundError:
+            continue
+        captures.append({
+            "id": capture_id,
+            "files": [f"{capture_id}.folded", f"{capture_id}.speedscope.json"],
+            "bytes": size,
+        })
+    return captures
+
+
+def capture_path(filename: str) -> Optional[str]:
+    """
+    Path of a stored capture file, or None (also for anything that is
+    not a plain file name inside the ring directory).
+    """
+    if not _safe_name.match(filename) or not (
+        filename.endswith(".folded") or filename.endswith(".speedscope.json")
+    ):
+        return None
+    path = os.path.join(PROFILE_DIR, filename)
+    return path if os.path.isfile(path) else None
+
+# =========================================================
+# Capture
+# =========================================================
+
+class Capture:
+    id: Optional[str] = None
+
+
+@contextmanager
+def capture(label: str):
+    """
+    Profile the calling thread for the duration of the block and store
+    the result in the ring. `.id` is set on exit.
+    """
+
+    result = Capture()
+    sampler = ThreadSampler(threading.get_ident())
+    sampler.start()
+    try:
+        yield result
+    finally:
+        sampler.stop()
+        try:
+            result.id = _save(label, sampler)
+            logger.info(
+                f"🔬 Captured profile {result.id} "
+                f"({sum(sampler.stacks.values())} samples)"
+            )
+        except Exception:
+            logger.exception("Could not store request profile")
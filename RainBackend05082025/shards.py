@@ -0,0 +1,304 @@
+import hashlib
+import itertools
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+import embeddings
+from event_data import load_event_profiles
+from matchmaking import ProfileIndex
+from models import PersonProfile
+
+# =========================================================
+# Logging
+# =========================================================
+
+logger = logging.getLogger(__name__)
+
+# =========================================================
+# Configuration (TUNABLE)
+# =========================================================
+
+BASE_DIR = os.path.dirname(__file__)
+DATA_DIR = os.path.join(BASE_DIR, "data")
+SHARD_DIR = os.path.join(DATA_DIR, "shards")
+
+# A shard is evicted when either limit is exceeded (least recently
+# used first); the shard just requested is never evicted.
+MAX_LOADED_SHARDS = 8
+SHARD_MEMORY_BUDGET_MB = 256
+
+# =========================================================
+# Paths
+# =========================================================
+
+def shard_key(event_id: str) -> str:
+    """
+    Collection/file-safe name, unique per event id.
+    """
+    safe = re.sub(r"[^A-Za-z0-9_-]", "_", event_id)[:40]
+    digest = hashlib.sha1(event_id.encode("utf-8")).hexdigest()[:8]
+    return f"event_{safe}_{digest}"
+
+
+def matrix_path(event_id: str) -> str:
+    return os.path.join(SHARD_DIR, f"{shard_key(event_id)}.npz")
+
+# =========================================================
+# Shards
+# =========================================================
+
+_load_numbers = itertools.count(1)
+
+
+class Shard:
+    """
+    One event's profiles and its own ProfileIndex (collections named
+    after the event), backed by a matrix file with the embeddings.
+
+    Requests hold a reference (acquire_shard() ... release()). An
+    evicted or invalidated shard is only retired: its collections are
+    dropped when the last request using it releases it.
+    """
+
+    def __init__(self, event_id: str, profiles: List[PersonProfile]):
+        self.event_id = event_id
+        self.profiles = profiles
+        self.by_id: Dict[str, PersonProfile] = {p.id: p for p in profiles}
+
+        # Numbered per load: a retired shard still in use and its
+        # replacement must not share (and later drop) the same collections
+        key = f"{shard_key(event_id)}_{next(_load_numbers)}"
+        self.index = ProfileIndex(key, f"{key}_objectives")
+        self.loaded_at = time.time()
+
+        self._refs = 0
+        self._retired = False
+        self._ref_lock = threading.Lock()
+
+    def acquire(self) -> "Shard":
+        with self._ref_lock:
+            self._refs += 1
+        return self
+
+    def release(self) -> None:
+        with self._ref_lock:
+            self._refs -= 1
+            drop = self._retired and self._refs == 0
+        if drop:
+            self.index.drop()
+
+    def retire(self) -> None:
+        with self._ref_lock:
+            self._retired = True
+            drop = self._refs == 0
+        if drop:
+            self.index.drop()
+
+    def person(self, person_id: str) -> Optional[PersonProfile]:
+        return self.by_id.get(person_id)
+
+    def candidates_for(self, person_id: str) -> List[PersonProfile]:
+        return [p for p in self.profiles if p.id != person_id]
+
+    def memory_bytes(self) -> int:
+        return self.index.memory_bytes()
+
+
+_dimensions: Dict[str, int] = {}   # provider name -> output dimension
+
+
+def _provider_signature() -> Tuple[str, int]:
+    """
+    (name, output dimension) of the current embedding provider. Vectors
+    from any other provider or REDUCE_DIM cannot be reused. The
+    dimension is probed with one embedding call per provider.
+    """
+    provider = embeddings.get_provider()
+    if provider.name not in _dimensions:
+        _dimensions[provider.name] = int(
+            provider.embed(["dimension"]).shape[1]
+        )
+    return provider.name, _dimensions[provider.name]
+
+
+def _read_matrix(event_id: str) -> Optional[Dict[str, np.ndarray]]:
+    path = matrix_path(event_id)
+    if not os.path.exists(path):
+        return None
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            arrays = {k: data[k] for k in data.files}
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable shard file {path}: {e}")
+        return None
+
+    saved = (
+        str(arrays.pop("provider", "")), int(arrays.pop("dimension", 0))
+    )
+    current = _provider_signature()
+    if saved != current:
+        logger.warning(
+            f"Ignoring shard file {path}: embedded with {saved[0] or '?'} "
+            f"({saved[1]}d), current provider is {current[0]} "
+            f"({current[1]}d)"
+        )
+        return None
+    return arrays
+
+
+def _write_matrix(event_id: str, arrays: Dict[str, np.ndarray]) -> None:
+    os.makedirs(SHARD_DIR, exist_ok=True)
+    path = matrix_path(event_id)
+    tmp = f"{path}.tmp.npz"
+    name, dimension = _provider_signature()
+    np.savez(
+        tmp, provider=np.asarray(name), dimension=np.asarray(dimension),
+        **arrays,
+    )
+    os.replace(tmp, path)
+
+
+def build_shard(event_id: str) -> Shard:
+    """
+    Load an event's profiles and index them, reusing vectors from the
+    matrix file where the profile is unchanged. Only new or edited
+    profiles are embedded; the file is rewritten if any were.
+    """
+
+    started = time.perf_counter()
+    shard = Shard(event_id, load_event_profiles(event_id))
+
+    arrays = _read_matrix(event_id)
+    restored = (
+        shard.index.import_arrays(arrays, shard.profiles) if arrays else 0
+    )
+    embedded = shard.index.upsert_profiles(shard.profiles)
+
+    # arrays is None also when the file came from another provider
+    if embedded or arrays is None:
+        _write_matrix(event_id, shard.index.export_arrays())
+
+    logger.info(
+        f"🧩 Loaded shard '{event_id}': {len(shard.profiles)} profiles "
+        f"({restored} restored, {embedded} embedded) in "
+        f"{time.perf_counter() - started:.2f}s"
+    )
+    return shard
+
+
+class ShardManager:
+    """
+    Event shards loaded on demand into a memory-bounded LRU.
+    """
+
+    def __init__(
+        self,
+        max_shards: int = MAX_LOADED_SHARDS,
+        memory_budget_mb: int = SHARD_MEMORY_BUDGET_MB,
+    ):
+        self.max_shards = max_shards
+        self.memory_budget = memory_budget_mb * 1024 * 1024
+        self._shards: "OrderedDict[str, Shard]" = OrderedDict()
+        self._loading: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, event_id: str) -> Shard:
+        """
+        The event's shard, loading it if needed, with a reference held
+        for the caller; call release() on it when done.
+        """
+        with self._lock:
+            shard = self._shards.get(event_id)
+            if shard is not None:
+                self._shards.move_to_end(event_id)
+                return shard.acquire()
+            loading = self._loading.setdefault(event_id, threading.Lock())
+
+        # Loading one event never blocks queries against other events
+        try:
+            with loading:
+                with self._lock:
+                    shard = self._shards.get(event_id)
+                    if shard is not None:
+                        self._shards.move_to_end(event_id)
+                        return shard.acquire()
+
+                shard = build_shard(event_id)
+
+                with self._lock:
+                    self._shards[event_id] = shard
+                    shard.acquire()
+                    evicted = self._evict_locked(keep=event_id)
+        finally:
+            # Event ids come from requests: keep no entry per id tried
+            with self._lock:
+                if self._loading.get(event_id) is loading:
+                    del self._loading[event_id]
+
+        for old in evicted:
+            old.retire()
+            logger.info(f"♻️ Evicted shard '{old.event_id}'")
+        return shard
+
+    def _evict_locked(self, keep: str) -> List[Shard]:
+        evicted = []
+
+        def over_budget():
+            used = sum(s.memory_bytes() for s in self._shards.values())
+            return (
+                len(self._shards) > self.max_shards
+                or used > self.memory_budget
+            )
+
+        while over_budget() and len(self._shards) > 1:
+            event_id = next(iter(self._shards))
+            if event_id == keep:
+                break
+            evicted.append(self._shards.pop(event_id))
+        return evicted
+
+    def reindex(self, event_id: str) -> None:
+        """
+        Drop one event's shard and matrix file; the next request
+        rebuilds it. Other events are untouched.
+        """
+        with self._lock:
+            shard = self._shards.pop(event_id, None)
+        if shard is not None:
+            shard.retire()
+
+        path = matrix_path(event_id)
+        if os.path.exists(path):
+            os.remove(path)
+        logger.info(f"🔄 Shard '{event_id}' invalidated")
+
+    def stats(self) -> List[dict]:
+        with self._lock:
+            shards = list(self._shards.values())
+        return [
+            {
+                "event_id": s.event_id,
+                "profiles": len(s.profiles),
+                "memory_bytes": s.memory_bytes(),
+                "loaded_at": s.loaded_at,
+            }
+            for s in shards
+        ]
+
+
+manager = ShardManager()
+
+
+def acquire_shard(event_id: str) -> Shard:
+    return manager.acquire(event_id)
+
+
+def reindex_shard(event_id: str) -> None:
+    manager.reindex(event_id)
@@ -0,0 +1,401 @@
+import argparse
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+import bm25
+import matchmaking
+import profile_store
+from models import PersonProfile
+
+# =========================================================
+# Logging
+# =========================================================
+
+logger = logging.getLogger(__name__)
+
+# =========================================================
+# Configuration (TUNABLE, overridable per deployment via env)
+# =========================================================
+
+SHARED_INDEX_DIR = os.getenv(
+    "RAIN_SHARED_INDEX_DIR",
+    os.path.join(profile_store.DATA_DIR, "index"),
+)
+
+SWAP_CHECK_SECONDS = 1.0    # workers look for a new generation this often
+BUILD_POLL_SECONDS = 2.0    # builder checks the profile store this often
+KEEP_GENERATIONS = 2        # older generation directories are removed
+
+CURRENT_FILE = "CURRENT"
+
+# =========================================================
+# Generation layout
+# =========================================================
+#
+# SHARED_INDEX_DIR/
+#   CURRENT            -> "7" (replaced atomically)
+#   gen-000007/
+#     vectors.npy          float32, one unit row per profile (mapped)
+#     clause_vectors.npy   float32, one unit row per objective clause (mapped)
+#     profile_ids.npy, clause_owners.npy, clauses.npy
+#     bm25_*.npy           BM25 postings in CSR layout (mapped)
+#     meta.json
+#
+# A generation is never modified after CURRENT points at it, so workers
+# can map it without locks; a reader that still holds an older one keeps
+# a valid mapping until it swaps, even after the directory is removed.
+
+def _generation_dir(root: str, number: int) -> str:
+    return os.path.join(root, f"gen-{number:06d}")
+
+
+def read_current(root: str = SHARED_INDEX_DIR) -> Optional[int]:
+    try:
+        with open(os.path.join(root, CURRENT_FILE), "r") as f:
+            return int(f.read().strip())
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _generation_numbers(root: str) -> List[int]:
+    """
+    Numbers of the complete generation directories under root.
+    """
+    numbers = []
+    for name in os.listdir(root):
+        if not name.startswith("gen-") or name.endswith(".tmp"):
+            continue
+        try:
+            numbers.append(int(name[4:]))
+        except ValueError:
+            continue
+    return numbers
+
+
+def _unit_rows(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if not vectors.size:
+        return vectors
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def write_generation(
+    arrays: Dict[str, np.ndarray],
+    lexical: Dict[str, np.ndarray],
+    root: str = SHARED_INDEX_DIR,
+) -> int:
+    """
+    Write a complete generation next to the live one, then publish it
+    by replacing CURRENT. `lexical` is BM25Index.freeze() over the
+    profile ids. Returns the new generation number.
+    """
+
+    os.makedirs(root, exist_ok=True)
+    # Past every directory, not just CURRENT: a builder that died between
+    # the two renames below leaves a complete but unpublished generation
+    number = max(_generation_numbers(root) + [read_current(root) or 0]) + 1
+
+    final = _generation_dir(root, number)
+    tmp = f"{final}.tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+
+    np.save(os.path.join(tmp, "vectors.npy"), _unit_rows(arrays["vectors"]))
+    np.save(
+        os.path.join(tmp, "clause_vectors.npy"),
+        _unit_rows(arrays["clause_vectors"]),
+    )
+    for name in ("profile_ids", "clause_owners", "clauses"):
+        np.save(os.path.join(tmp, f"{name}.npy"), arrays[name])
+    for name, values in lexical.items():
+        np.save(os.path.join(tmp, f"{name}.npy"), values)
+
+    with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump({
+            "generation": number,
+            "profiles": int(len(arrays["profile_ids"])),
+            "clauses": int(len(arrays["clauses"])),
+            "dimension": int(np.asarray(arrays["vectors"]).shape[1])
+            if len(arrays["profile_ids"]) else 0,
+            "built_at": time.time(),
+        }, f)
+
+    os.replace(tmp, final)
+
+    pointer = os.path.join(root, f"{CURRENT_FILE}.tmp")
+    with open(pointer, "w") as f:
+        f.write(str(number))
+    os.replace(pointer, os.path.join(root, CURRENT_FILE))
+
+    _prune(root, number)
+    return number
+
+
+def _prune(root: str, current: int) -> None:
+    for number in _generation_numbers(root):
+        if number <= current - KEEP_GENERATIONS:
+            # May fail on Windows while a worker still maps it; retried
+            # after the next build
+            shutil.rmtree(_generation_dir(root, number), ignore_errors=True)
+
+# =========================================================
+# Reader (every server process)
+# =========================================================
+
+class Generation:
+    """
+    One published generation, memory-mapped read-only. Only the small
+    id tables are materialized per process; BM25 postings are mapped
+    as the builder wrote them, so a swap never re-tokenizes profiles.
+    """
+
+    def __init__(self, root: str, number: int):
+        path = _generation_dir(root, number)
+        self.number = number
+
+        self.vectors = np.load(
+            os.path.join(path, "vectors.npy"), mmap_mode="r"
+        )
+        self.clause_vectors = np.load(
+            os.path.join(path, "clause_vectors.npy"), mmap_mode="r"
+        )
+
+        self.ids = [str(i) for i in np.load(
+            os.path.join(path, "profile_ids.npy")
+        )]
+        self.rows = {pid: row for row, pid in enumerate(self.ids)}
+
+        self.clause_owners = [str(o) for o in np.load(
+            os.path.join(path, "clause_owners.npy")
+        )]
+        clauses = np.load(os.path.join(path, "clauses.npy"))
+        self.objectives: Dict[str, List[str]] = {}
+        for owner, clause in zip(self.clause_owners, clauses):
+            self.objectives.setdefault(owner, []).append(str(clause))
+
+        self.lexical = bm25.FrozenBM25(self.ids, {
+            name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+            for name in (
+                "bm25_terms", "bm25_offsets", "bm25_rows", "bm25_tfs",
+                "bm25_lengths",
+            )
+        })
+
+
+def _top(similarities: np.ndarray, n: int) -> np.ndarray:
+    n = min(n, len(similarities))
+    if n <= 0:
+        return np.zeros(0, dtype=np.int64)
+    part = np.argpartition(-similarities, n - 1)[:n]
+    return part[np.argsort(-similarities[part], kind="stable")]
+
+
+class MappedIndex:
+    """
+    Read-only stand-in for matchmaking.ProfileIndex over the latest
+    published generation. Search is exact (one matrix-vector product
+    over the mapped rows); distances use the same metric the Chroma
+    collection would, so scoring is unchanged.
+
+    A new generation is picked up at the start of each ranking
+    (ensure_indexed), by swapping one reference.
+    """
+
+    def __init__(self, root: str = SHARED_INDEX_DIR):
+        self.root = root
+        self._generation: Optional[Generation] = None
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    # -----------------------------------------------------
+    # Generations
+    # -----------------------------------------------------
+
+    def refresh(self, force: bool = False) -> Optional[Generation]:
+        now = time.monotonic()
+        if not force and now - self._checked < SWAP_CHECK_SECONDS:
+            return self._generation
+        self._checked = now
+
+        number = read_current(self.root)
+        current = self._generation
+        if number is None or (current and current.number == number):
+            return current
+
+        with self._lock:
+            if self._generation is None or self._generation.number != number:
+                self._generation = Generation(self.root, number)
+                logger.info(
+                    f"🔀 Mapped shared index generation {number} "
+                    f"({len(self._generation.ids)} profiles)"
+                )
+        return self._generation
+
+    @property
+    def generation(self) -> Optional[int]:
+        return self._generation.number if self._generation else None
+
+    # -----------------------------------------------------
+    # ProfileIndex interface (reads)
+    # -----------------------------------------------------
+
+    def open(self) -> "MappedIndex":
+        self.refresh(force=True)
+        return self
+
+    def ensure_indexed(self, candidates: List[PersonProfile]) -> None:
+        # The builder process owns indexing; just follow its generations
+        self.refresh()
+
+    @property
+    def documents(self) -> Dict[str, int]:
+        # id -> row; scoring only looks at the keys
+        return self._generation.rows if self._generation else {}
+
+    @property
+    def objectives(self) -> Dict[str, List[str]]:
+        return self._generation.objectives if self._generation else {}
+
+    @property
+    def lexical(self):
+        if self._generation is None:
+            return bm25.BM25Index()
+        return self._generation.lexical
+
+    def memory_bytes(self) -> int:
+        gen = self._generation
+        if gen is None:
+            return 0
+        return gen.vectors.nbytes + gen.clause_vectors.nbytes
+
+    def count(self) -> int:
+        return len(self._generation.ids) if self._generation else 0
+
+    def query(self, query_embedding: np.ndarray, n_results: int):
+        gen = self._generation
+        if gen is None or n_results <= 0 or not gen.ids:
+            return [], []
+
+        sims = gen.vectors @ np.asarray(query_embedding, dtype=np.float32)
+        top = _top(sims, n_results)
+        scale = 1.0 if matchmaking.SCORING_MODE == "cosine" else 2.0
+        return (
+            [gen.ids[i] for i in top],
+            [scale * (1.0 - float(sims[i])) for i in top],
+        )
+
+    def fetch_embeddings(self, ids: List[str]):
+        gen = self._generation
+        if gen is None:
+            return [], np.zeros((0, 0), dtype=np.float32)
+
+        present = [pid for pid in ids if pid in gen.rows]
+        rows = [gen.rows[pid] for pid in present]
+        return present, np.asarray(gen.vectors[rows])
+
+    def query_objectives(self, query_embeddings: np.ndarray, n_results: int):
+        gen = self._generation
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        if gen is None or not gen.clause_owners:
+            return [[] for _ in queries], [[] for _ in queries]
+
+        sims = queries @ gen.clause_vectors.T
+        people, distances = [], []
+        for row in sims:
+            top = _top(row, n_results)
+            people.append([gen.clause_owners[i] for i in top])
+            distances.append([1.0 - float(row[i]) for i in top])
+        return people, distances
+
+
+def attach(root: str = SHARED_INDEX_DIR) -> MappedIndex:
+    """
+    Make the mapped index this process's default index.
+    """
+    index = MappedIndex(root).open()
+    matchmaking.default_index = index
+    if index.generation is None:
+        logger.warning(
+            f"No shared index generation in {root} yet; "
+            "is the builder (`python shared_index.py serve`) running?"
+        )
+    return index
+
+# =========================================================
+# Builder (one process)
+# =========================================================
+
+class Builder:
+    """
+    Keeps a private ProfileIndex in step with the profile store, so a
+    rebuild only embeds profiles that changed, and publishes each
+    state as a new generation.
+    """
+
+    def __init__(self, root: str = SHARED_INDEX_DIR):
+        self.root = root
+        self.index = matchmaking.ProfileIndex(
+            "shared_build", "shared_build_objectives"
+        )
+
+    def build(self) -> int:
+        started = time.perf_counter()
+
+        people = profile_store.list_persons()
+
+        current = {p.id for p in people}
+        stale = [pid for pid in self.index.documents if pid not in current]
+        if stale:
+            self.index.delete_profiles(stale)
+        embedded = self.index.upsert_profiles(people)
+
+        arrays = self.index.export_arrays()
+        lexical = self.index.lexical.freeze(
+            [str(pid) for pid in arrays["profile_ids"]]
+        )
+        number = write_generation(arrays, lexical, self.root)
+
+        logger.info(
+            f"📦 Published shared index generation {number}: "
+            f"{len(people)} profiles ({embedded} embedded, "
+            f"{len(stale)} removed) in {time.perf_counter() - started:.2f}s"
+        )
+        return number
+
+    def serve(self, poll_seconds: float = BUILD_POLL_SECONDS) -> None:
+        """
+        Rebuild whenever another process commits to the profile store.
+        """
+        last = None
+        while True:
+            version = profile_store.data_version()
+            if version != last:
+                try:
+                    self.build()
+                    last = version
+                except Exception:
+                    logger.exception("Shared index build failed")
+            time.sleep(poll_seconds)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description="Shared embedding index")
+    parser.add_argument("command", choices=["build", "serve"])
+    parser.add_argument("--dir", default=SHARED_INDEX_DIR)
+    args = parser.parse_args()
+
+    builder = Builder(args.dir)
+    if args.command == "build":
+        builder.build()
+    else:
+        builder.serve()
@@ -0,0 +1,97 @@
+import importlib
+import logging
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+# =========================================================
+# Logging
+# =========================================================
+
+logger = logging.getLogger(__name__)
+
+# =========================================================
+# Startup timeline
+# =========================================================
+#
+# All times are milliseconds since this module was first imported,
+# which main.py does before anything else. For a full per-module
+# breakdown run `python -X importtime main.py`.
+
+STARTED_AT = time.perf_counter()
+
+_imports: Dict[str, float] = {}
+_phases: Dict[str, float] = {}
+_marks: Dict[str, float] = {}
+_ready = threading.Event()
+_error: Optional[str] = None
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 1)
+
+
+def timed_import(name: str):
+    """
+    Import a module and record how long it took. Modules already
+    imported (e.g. as a dependency of an earlier one) record 0.
+    """
+    if name in sys.modules:
+        _imports.setdefault(name, 0.0)
+        return sys.modules[name]
+
+    start = time.perf_counter()
+    module = importlib.import_module(name)
+    _imports[name] = _ms(time.perf_counter() - start)
+    return module
+
+
+@contextmanager
+def phase(name: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _phases[name] = _ms(time.perf_counter() - start)
+
+
+def mark(name: str) -> None:
+    _marks[name] = _ms(time.perf_counter() - STARTED_AT)
+
+# =========================================================
+# Readiness
+# =========================================================
+
+def mark_ready() -> None:
+    mark("ready")
+    _ready.set()
+
+
+def mark_failed(error: str) -> None:
+    global _error
+    _error = error
+    mark("failed")
+
+
+def is_ready() -> bool:
+    return _ready.is_set()
+
+
+def report() -> dict:
+    return {
+        "ready": is_ready(),
+        "error": _error,
+        "marks_ms": dict(_marks),
+        "imports_ms": dict(_imports),
+        "phases_ms": dict(_phases),
+    }
+
+
+def log_report() -> None:
+    imports = ", ".join(f"{k}={v}ms" for k, v in _imports.items())
+    phases = ", ".join(f"{k}={v}ms" for k, v in _phases.items())
+    logger.info(f"⏱️ Startup marks: {_marks}")
+    logger.info(f"⏱️ Imports: {imports}")
+    logger.info(f"⏱️ Phases: {phases}")
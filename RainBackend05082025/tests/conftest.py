@@ -0,0 +1,38 @@
+import os
+import shutil
+import sys
+
+import pytest
+
+# Modules live flat in the package directory; tests never load a model
+os.environ.setdefault("RAIN_EMBEDDING_PROVIDER", "hash")
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+import embeddings  # noqa: E402
+import profile_store  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def hash_provider(monkeypatch):
+    monkeypatch.setattr(embeddings, "_provider", embeddings.HashProvider())
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """
+    A fresh profile store, seeded from the data/ seed files.
+    """
+    seed_dir = tmp_path / "data"
+    seed_dir.mkdir()
+    for name in (profile_store.PROFILES_SEED, profile_store.OBJECTIVES_SEED):
+        shutil.copy(os.path.join(profile_store.DATA_DIR, name), seed_dir)
+
+    monkeypatch.setattr(profile_store, "DATA_DIR", str(seed_dir))
+    monkeypatch.setattr(
+        profile_store, "DB_PATH", str(seed_dir / "profiles.sqlite3")
+    )
+    monkeypatch.setattr(profile_store, "_conn", None)
+    yield profile_store
+    if profile_store._conn is not None:
+        profile_store._conn.close()
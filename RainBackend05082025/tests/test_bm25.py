@@ -0,0 +1,88 @@
+import math
+
+import pytest
+
+import bm25
+
+DOCS = {
+    "a": "ISO27001 audit and cyber security consulting",
+    "b": "cyber security monitoring for trading desks",
+    "c": "productivity automation roadmap",
+    "d": "seed investors fintech startups",
+}
+
+
+@pytest.fixture
+def index():
+    index = bm25.BM25Index()
+    for doc_id, text in DOCS.items():
+        index.upsert(doc_id, text)
+    return index
+
+
+def _score(index, doc_id, terms):
+    n_docs = len(index.lengths)
+    avg_length = index.total_length / n_docs
+    total = 0.0
+    for term in terms:
+        posting = index.postings.get(term, {})
+        if doc_id not in posting:
+            continue
+        df = len(posting)
+        tf = posting[doc_id]
+        idf = math.log(1.0 + (n_docs - df + 0.5) / (df + 0.5))
+        norm = index.k1 * (
+            1.0 - index.b + index.b * index.lengths[doc_id] / avg_length
+        )
+        total += idf * tf * (index.k1 + 1.0) / (tf + norm)
+    return total
+
+
+def test_tokenize_keeps_exact_terms_and_drops_stopwords():
+    assert bm25.tokenize("Find an ISO27001 auditor for PnL") == [
+        "iso27001", "auditor", "pnl"
+    ]
+
+
+def test_search_scores_match_okapi_bm25(index):
+    results = index.search("cyber security audit", 10)
+
+    assert [doc_id for doc_id, _ in results] == ["a", "b"]
+    for doc_id, score in results:
+        assert score == pytest.approx(
+            _score(index, doc_id, ["cyber", "security", "audit"])
+        )
+
+
+def test_exact_term_match(index):
+    assert index.search("ISO27001", 10)[0][0] == "a"
+    assert index.search("the and for", 10) == []
+    assert index.search("blockchain", 10) == []
+
+
+def test_upsert_and_remove_keep_totals_in_step(index):
+    assert index.upsert("a", DOCS["a"]) is False
+
+    index.upsert("a", "blockchain payments")
+    assert index.search("ISO27001", 10) == []
+    assert index.search("blockchain", 10)[0][0] == "a"
+
+    index.remove("a")
+    assert len(index) == 3
+    assert index.total_length == sum(index.lengths.values())
+    assert "blockchain" not in index.postings
+
+
+def test_frozen_index_matches_live_index(index):
+    doc_ids = list(DOCS)
+    frozen = bm25.FrozenBM25(doc_ids, index.freeze(doc_ids))
+
+    for query in ("cyber security audit", "ISO27001", "fintech startups",
+                  "roadmap for trading", "nothing matches"):
+        live = index.search(query, 10)
+        assert [d for d, _ in frozen.search(query, 10)] == [
+            d for d, _ in live
+        ]
+        assert [s for _, s in frozen.search(query, 10)] == pytest.approx(
+            [s for _, s in live]
+        )
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+import embeddings
+
+
+def test_hash_provider_is_deterministic_and_normalized():
+    texts = ["Find seed investors for a fintech startup", "ISO27001 audit"]
+    first = embeddings.HashProvider().embed(texts)
+    second = embeddings.HashProvider(batch_size=1).embed(texts)
+
+    assert first.dtype == np.float32
+    assert first.shape == (2, embeddings.HASH_DIM)
+    np.testing.assert_allclose(first, second)
+    np.testing.assert_allclose(np.linalg.norm(first, axis=1), 1.0, rtol=1e-5)
+
+
+def test_reduced_provider_projects_to_dim():
+    provider = embeddings.ReducedProvider(embeddings.HashProvider(), 64)
+    vectors = provider.embed(["cyber security", "trading desk pilot"])
+
+    assert provider.name == "hash+rp64"
+    assert vectors.shape == (2, 64)
+    np.testing.assert_allclose(np.linalg.norm(vectors, axis=1), 1.0, rtol=1e-5)
+
+
+def test_reduced_provider_rejects_dim_not_below_source():
+    with pytest.raises(ValueError):
+        embeddings.ReducedProvider(
+            embeddings.HashProvider(), embeddings.HASH_DIM
+        )
+
+
+def test_reduced_provider_rejects_dim_not_below_model_output():
+    # Model providers only learn their dimension from the first batch
+    class EightDims(embeddings.EmbeddingProvider):
+        name = "eight"
+
+        def _embed_batch(self, texts):
+            return np.ones((len(texts), 8), dtype=np.float32)
+
+    provider = embeddings.ReducedProvider(EightDims(), 8)
+    with pytest.raises(ValueError):
+        provider.embed(["anything"])
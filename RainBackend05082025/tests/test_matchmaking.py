@@ -0,0 +1,79 @@
+import itertools
+
+import pytest
+
+import matchmaking
+
+_index_names = itertools.count(1)
+
+
+@pytest.fixture
+def people(store):
+    return store.list_persons()
+
+
+@pytest.fixture
+def index():
+    name = f"test_profiles_{next(_index_names)}"
+    index = matchmaking.ProfileIndex(name, f"{name}_objectives")
+    yield index
+    index.drop()
+
+
+@pytest.mark.parametrize("aggregation", ["sum", "max", "softmax"])
+@pytest.mark.parametrize("min_score", [0.0, 0.1])
+def test_adaptive_recall_matches_exhaustive_search(
+    people, index, monkeypatch, aggregation, min_score
+):
+    monkeypatch.setattr(matchmaking, "SCORING_MODE", "cosine")
+    monkeypatch.setattr(matchmaking, "AGGREGATION", aggregation)
+    monkeypatch.setattr(matchmaking, "MIN_SCORE", min_score)
+    index.upsert_profiles(people)
+
+    users = [p for p in people if p.objectives]
+    assert users
+
+    for user in users:
+        candidates = [p for p in people if p.id != user.id]
+
+        monkeypatch.setattr(matchmaking, "RECALL_MODE", "fixed")
+        monkeypatch.setattr(matchmaking, "CHROMA_RECALL_K", len(candidates))
+        exhaustive = matchmaking.rank_best_matches_per_objective(
+            user, candidates, index=index
+        )
+
+        monkeypatch.setattr(matchmaking, "RECALL_MODE", "adaptive")
+        monkeypatch.setattr(matchmaking, "ADAPTIVE_INITIAL_K", 2)
+        adaptive = matchmaking.rank_best_matches_per_objective(
+            user, candidates, index=index
+        )
+
+        assert [m["person"] for m in adaptive] == [
+            m["person"] for m in exhaustive
+        ], user.id
+        # Scores are reported rounded to 6 places
+        assert [m["score"] for m in adaptive] == pytest.approx(
+            [m["score"] for m in exhaustive], abs=2e-6
+        )
+
+
+def test_ensure_indexed_leaves_worker_owned_index_alone(people, index):
+    index.upsert_profiles(people[:3])
+    index.background_indexing = True
+
+    index.ensure_indexed(people)
+
+    assert set(index.documents) == {p.id for p in people[:3]}
+
+
+def test_ensure_indexed_adds_only_missing_profiles(people, index):
+    index.upsert_profiles(people[:3])
+    stale = people[0].model_copy(update={"skills": ["Something new"]})
+
+    index.ensure_indexed([stale] + people[3:5])
+
+    assert set(index.documents) == {p.id for p in people[:5]}
+    # A request's copy never overwrites what is indexed
+    assert index.documents[stale.id] == matchmaking.profile_to_document(
+        people[0]
+    )
@@ -0,0 +1,84 @@
+import csv
+import itertools
+
+from models import PersonProfile
+
+import pair_export
+
+
+def _people():
+    return [
+        PersonProfile(id="1", name="Ann", skills=["AI", "Startups"],
+                      objectives=["Find investors; Hire a CTO"]),
+        PersonProfile(id="2", name="Ben", skills=["ai", "Fintech"],
+                      objectives=["Find investors"]),
+        PersonProfile(id="3", name="Cat", skills=["Fintech", "Startups"],
+                      objectives=["Hire a CTO"]),
+        PersonProfile(id="4", name="Dan", skills=["Gardening"],
+                      objectives=["Sell a company"]),
+    ]
+
+
+def _brute_force(people):
+    pairs = {}
+    for i, j in itertools.combinations(range(len(people)), 2):
+        interests = (
+            {t.lower() for t in pair_export.interest_tags(people[i])}
+            & {t.lower() for t in pair_export.interest_tags(people[j])}
+        )
+        objectives = (
+            {t.lower() for t in pair_export.objective_tags(people[i])}
+            & {t.lower() for t in pair_export.objective_tags(people[j])}
+        )
+        if interests or objectives:
+            pairs[(i, j)] = (interests, objectives)
+    return pairs
+
+
+def test_generate_pairs_matches_brute_force():
+    people = _people()
+    pairs = {
+        (i, j): ({t.lower() for t in si}, {t.lower() for t in so})
+        for i, j, si, so in pair_export.generate_pairs(people)
+    }
+    assert pairs == _brute_force(people)
+
+
+def test_top_k_keeps_best_partners_once():
+    people = _people()
+    pairs = list(pair_export.generate_pairs(people, top_k=1))
+
+    keys = [tuple(sorted((i, j))) for i, j, _, _ in pairs]
+    assert len(keys) == len(set(keys))
+    # Everyone with any partner keeps at least one
+    assert {p for key in keys for p in key} == {0, 1, 2}
+
+
+def test_max_posting_skips_common_tags():
+    people = _people()
+    pairs = list(pair_export.generate_pairs(people, max_posting=1))
+    assert pairs == []
+
+
+def test_export_writes_csv(tmp_path):
+    out = tmp_path / "pairs.csv"
+    rows = pair_export.export_pairs(_people(), str(out))
+
+    with open(out, newline="", encoding="utf-8") as f:
+        written = list(csv.reader(f))
+    assert written[0] == pair_export.CSV_FIELDS
+    assert rows == 3
+    assert len(written) == rows + 1
+
+
+def test_export_joins_shared_tags_like_existing_exports(tmp_path):
+    people = [
+        PersonProfile(id="1", name="Ann", skills=["Startups", "AI"]),
+        PersonProfile(id="2", name="Ben", skills=["AI", "Startups"]),
+    ]
+    out = tmp_path / "pairs.csv"
+    pair_export.export_pairs(people, str(out))
+
+    with open(out, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert rows[0]["shared_interests"] == "Startups, AI"
@@ -0,0 +1,26 @@
+import numpy as np
+
+import recommendations
+
+
+def _catalog():
+    items = [
+        {"id": "n1", "title": "Scaling a business", "body": "",
+         "tags": ["Business", "Startups"]},
+        {"id": "n2", "title": "Model serving", "body": "", "tags": ["AI"]},
+    ]
+    return recommendations.Catalog(items, "body", lambda item: item["tags"])
+
+
+def test_tags_match_singular_and_plural():
+    catalog = _catalog()
+    assert catalog.tags_in("I run a business for startup founders") == [
+        "business", "startups"
+    ]
+    assert catalog.tags_in("AI for Startups") == ["ai", "startups"]
+
+
+def test_top_skips_items_without_positive_score():
+    catalog = _catalog()
+    assert [i["id"] for i in catalog.top(np.array([0.3, 0.0]), 5)] == ["n1"]
+    assert catalog.top(np.array([-0.1, -0.2]), 5) == []